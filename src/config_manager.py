@@ -2,8 +2,23 @@
 Configuration manager for ReviAI
 """
 import configparser
-from pathlib import Path
-from typing import Dict, Any
+import hmac
+import io
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True, slots=True)
+class ReviAIConfig:
+    """Read-only view of config.ini with values already converted"""
+    gemini_api_key: str
+    gemini_model: str = 'gemini-2.5-pro'
+    default_output_dir: str = './output'
+    temperature: int = 0
+    max_output_tokens: int = 8192
+    max_retries: int = 3
 
 
 class ConfigManager:
@@ -12,24 +27,119 @@ class ConfigManager:
     CONFIG_FILE = "config.ini"
     PROMPT_FILE = "prompt_template.txt"
 
+    # Parsed config keyed on (st_mtime_ns, st_size) of CONFIG_FILE
+    _cache: Optional[Tuple[Tuple[int, int], configparser.ConfigParser]] = None
+    # Dict and ReviAIConfig views, built lazily from the current _cache entry
+    _config_dict: Optional[Dict[str, Any]] = None
+    _settings: Optional[ReviAIConfig] = None
+    # Prompt template text keyed on (st_mtime_ns, st_size) of PROMPT_FILE
+    _prompt_cache: Optional[Tuple[Tuple[int, int], str]] = None
+    # Paths recently found missing -> time.monotonic() of the failed stat
+    _missing: Dict[str, float] = {}
+    MISSING_TTL = 1.0
+
     @classmethod
     def load_config(cls) -> Dict[str, Any]:
         """
         Load configuration from config.ini
 
+        The parsed result is cached and reused until the file's mtime or
+        size changes.
+
         Returns:
             Dict containing configuration settings
         """
-        config = configparser.ConfigParser()
-        config_path = Path(cls.CONFIG_FILE)
+        return cls._copy_config(cls._cached_config())
+
+    @classmethod
+    def load_settings(cls) -> ReviAIConfig:
+        """
+        Load configuration from config.ini as a read-only object
+
+        Returns:
+            ReviAIConfig: Configuration with typed attribute access
+        """
+        config_dict = cls._cached_config()
+        if cls._settings is None:
+            cls._settings = ReviAIConfig(
+                **config_dict['API'],
+                **config_dict['Paths'],
+                **config_dict['Settings']
+            )
+        return cls._settings
+
+    @classmethod
+    def get(cls, section: str, key: str, default: Any = None, conv: Callable[[str], Any] = str) -> Any:
+        """
+        Read a single option without building the full config dict
+
+        Args:
+            section: Section name (e.g. 'Settings')
+            key: Option name (e.g. 'max_retries')
+            default: Value returned when the option is missing
+            conv: Conversion applied to the raw string value
+
+        Returns:
+            Converted option value, or default if not set
+        """
+        value = cls._parser().get(section, key, fallback=None)
+        if value is None:
+            return default
+        return conv(value)
+
+    @classmethod
+    def _parser(cls) -> configparser.ConfigParser:
+        """Return the cached parser, re-reading config.ini when it changed"""
+        key = cls._file_key(cls.CONFIG_FILE, "Configuration file not found")
+        if cls._cache is not None and cls._cache[0] == key:
+            return cls._cache[1]
+
+        config = cls._new_parser()
+        with open(cls.CONFIG_FILE, 'r', encoding='utf-8') as f:
+            config.read_string(f.read(), source=cls.CONFIG_FILE)
+
+        cls._cache = (key, config)
+        cls._config_dict = None
+        cls._settings = None
+        return config
+
+    @classmethod
+    def _file_key(cls, path: str, missing_message: str) -> Tuple[int, int]:
+        """
+        Get a file's (st_mtime_ns, st_size) cache key from a single os.stat
+
+        A missing file is remembered for MISSING_TTL seconds.
+
+        Raises:
+            FileNotFoundError: If the file doesn't exist (or was just found missing)
+        """
+        now = time.monotonic()
+        if now - cls._missing.get(path, float('-inf')) < cls.MISSING_TTL:
+            raise FileNotFoundError(f"{missing_message}: {path}")
 
-        if not config_path.exists():
-            raise FileNotFoundError(f"Configuration file not found: {cls.CONFIG_FILE}")
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            cls._missing[path] = now
+            raise FileNotFoundError(f"{missing_message}: {path}")
 
-        config.read(config_path, encoding='utf-8')
+        cls._missing.pop(path, None)
+        return (st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _new_parser() -> configparser.ConfigParser:
+        """Create a parser for the fixed config schema (no %-interpolation)"""
+        return configparser.ConfigParser(interpolation=None)
+
+    @classmethod
+    def _cached_config(cls) -> Dict[str, Any]:
+        """Return the config dict, building it only once per parse"""
+        config = cls._parser()
+        if cls._config_dict is not None:
+            return cls._config_dict
 
         # Convert to dict for easier access
-        config_dict = {
+        cls._config_dict = {
             'API': {
                 'gemini_api_key': config.get('API', 'gemini_api_key'),
                 'gemini_model': config.get('API', 'gemini_model', fallback='gemini-2.5-pro')
@@ -43,25 +153,102 @@ class ConfigManager:
                 'max_retries': config.getint('Settings', 'max_retries', fallback=3)
             }
         }
+        return cls._config_dict
 
-        return config_dict
+    @staticmethod
+    def default_config() -> Dict[str, Any]:
+        """
+        Build the config structure written when config.ini doesn't exist yet
+
+        Returns:
+            Dict containing default configuration settings (string values)
+        """
+        defaults = ReviAIConfig(gemini_api_key='')
+        return {
+            'API': {
+                'gemini_api_key': defaults.gemini_api_key,
+                'gemini_model': defaults.gemini_model
+            },
+            'Paths': {'default_output_dir': defaults.default_output_dir},
+            'Settings': {
+                'temperature': str(defaults.temperature),
+                'max_output_tokens': str(defaults.max_output_tokens),
+                'max_retries': str(defaults.max_retries)
+            }
+        }
+
+    @classmethod
+    def load_or_default(cls) -> Tuple[Dict[str, Any], bool]:
+        """
+        Load configuration, falling back to the defaults if config.ini is missing
+
+        Returns:
+            Tuple of (configuration dict, whether config.ini exists)
+        """
+        try:
+            return cls.load_config(), True
+        except FileNotFoundError:
+            return cls.default_config(), False
+
+    @staticmethod
+    def _copy_config(config_dict: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy each section so callers can mutate the result safely"""
+        return {section: dict(options) for section, options in config_dict.items()}
 
     @classmethod
     def save_config(cls, config_dict: Dict[str, Any]) -> None:
         """
         Save configuration to config.ini
 
+        The given options are merged into the current file; sections and
+        options not in config_dict (e.g. pdf_backend, debug, excel_writer,
+        which load_config() doesn't return) are kept as they are.
+
         Args:
             config_dict: Configuration dictionary
         """
-        config = configparser.ConfigParser()
+        # Apply the changes to a copy of the cached parser; the cache is only
+        # replaced once the file has been written
+        config = cls._new_parser()
+        try:
+            config.read_dict(cls._parser())
+        except FileNotFoundError:
+            pass
 
-        for section, options in config_dict.items():
-            config[section] = options
+        config.read_dict(config_dict)
 
-        config_path = Path(cls.CONFIG_FILE)
-        with open(config_path, 'w', encoding='utf-8') as f:
-            config.write(f)
+        buf = io.StringIO()
+        config.write(buf)
+        cls._atomic_write(cls.CONFIG_FILE, buf.getvalue())
+
+        # The parser already matches the file just written
+        cls._cache = (cls._file_key(cls.CONFIG_FILE, "Configuration file not found"), config)
+        cls._config_dict = None
+        cls._settings = None
+
+    @classmethod
+    def _atomic_write(cls, path: str, content: str) -> None:
+        """
+        Write text to path in one buffered write via a temp file + rename
+
+        Args:
+            path: Destination file path
+            content: Text to write (UTF-8)
+        """
+        data = content.encode('utf-8')
+        tmp_path = f"{path}.tmp"
+        flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+        fd = os.open(tmp_path, flags, 0o644)
+        try:
+            view = memoryview(data)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+        cls._missing.pop(path, None)
 
     @classmethod
     def validate_api_key(cls, api_key: str) -> bool:
@@ -74,23 +261,32 @@ class ConfigManager:
         Returns:
             bool: True if valid, False otherwise
         """
-        return api_key and api_key != "YOUR_API_KEY_HERE" and len(api_key) > 10
+        # Compare as bytes: compare_digest rejects non-ASCII str input
+        return (
+            bool(api_key)
+            and len(api_key) > 10
+            and not hmac.compare_digest(api_key.encode('utf-8'), b"YOUR_API_KEY_HERE")
+        )
 
     @classmethod
     def get_prompt_template(cls) -> str:
         """
         Load prompt template from file
 
+        The content is cached and reused until the file's mtime or size
+        changes.
+
         Returns:
             str: Prompt template content
         """
-        prompt_path = Path(cls.PROMPT_FILE)
+        key = cls._file_key(cls.PROMPT_FILE, "Prompt template not found")
+        if cls._prompt_cache is not None and cls._prompt_cache[0] == key:
+            return cls._prompt_cache[1]
 
-        if not prompt_path.exists():
-            raise FileNotFoundError(f"Prompt template not found: {cls.PROMPT_FILE}")
-
-        with open(prompt_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        with open(cls.PROMPT_FILE, 'r', encoding='utf-8') as f:
+            content = f.read()
+        cls._prompt_cache = (key, content)
+        return content
 
     @classmethod
     def save_prompt_template(cls, content: str) -> None:
@@ -100,7 +296,41 @@ class ConfigManager:
         Args:
             content: Prompt template content
         """
-        prompt_path = Path(cls.PROMPT_FILE)
+        cls._atomic_write(cls.PROMPT_FILE, content)
+
+        cls._prompt_cache = None
+
+
+if __name__ == "__main__":
+    # Test code: saving the options the GUI edits keeps the other settings
+    import tempfile
 
-        with open(prompt_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ConfigManager.CONFIG_FILE = os.path.join(tmp_dir, "config.ini")
+        with open(ConfigManager.CONFIG_FILE, 'w', encoding='utf-8') as f:
+            f.write(
+                "[API]\ngemini_api_key = YOUR_API_KEY_HERE\ngemini_model = gemini-2.5-pro\n\n"
+                "[Paths]\ndefault_output_dir = ./output\n\n"
+                "[Settings]\ntemperature = 0\nmax_output_tokens = 8192\nmax_retries = 3\n"
+                "pdf_backend = spire\ndebug = true\nexcel_writer = xlsxwriter\n"
+            )
+
+        # Same flow as changing the model in Step 2
+        config_dict, _ = ConfigManager.load_or_default()
+        config_dict['API']['gemini_model'] = 'gemini-2.5-flash'
+        ConfigManager.save_config(config_dict)
+
+        # Re-read from disk, not from the cached parser
+        ConfigManager._cache = None
+        expected = {
+            ('API', 'gemini_model'): 'gemini-2.5-flash',
+            ('Settings', 'pdf_backend'): 'spire',
+            ('Settings', 'debug'): 'true',
+            ('Settings', 'excel_writer'): 'xlsxwriter',
+        }
+        failed = [
+            f"{section}/{key}: {ConfigManager.get(section, key)!r} != {value!r}"
+            for (section, key), value in expected.items()
+            if ConfigManager.get(section, key) != value
+        ]
+        print(f"Test failed: {failed}" if failed else "Test successful: unrelated settings kept")
@@ -1,15 +1,139 @@
 """
 Logging utility for ReviAI
 """
+import atexit
+import contextlib
 import logging
+import logging.handlers
+import multiprocessing
+import queue
 from pathlib import Path
 from datetime import datetime
+from typing import Iterator, Optional
+
+
+# Thread/process fields are not in our log format; skip collecting them per record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+# Background listeners writing records for each configured logger
+_listeners = {}
+
+
+def _stop_listeners() -> None:
+    """Drain and stop all background log listeners, then flush their handlers"""
+    while _listeners:
+        _, listener = _listeners.popitem()
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(_stop_listeners)
+
+
+class LazyFileHandler(logging.FileHandler):
+    """
+    FileHandler that opens the file, and creates its directory, on first
+    write and keeps records in a large stream buffer
+
+    The stream is flushed once BUFFER_SIZE characters are pending or when an
+    ERROR (or higher) record is written, instead of after every record.
+    """
+    BUFFER_SIZE = 128 * 1024
+
+    _pending = 0
+
+    def _open(self):
+        try:
+            return self._open_buffered()
+        except FileNotFoundError:
+            # Create logs directory only when it doesn't exist yet
+            Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+            return self._open_buffered()
+
+    def _open_buffered(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=self.BUFFER_SIZE,
+            encoding=self.encoding,
+            errors=self.errors
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self.stream is None:
+            if self.mode != 'w' or not self._closed:
+                self.stream = self._open()
+        if self.stream is None:
+            return
+        try:
+            msg = self.format(record) + self.terminator
+            self.stream.write(msg)
+            self._pending += len(msg)
+            if record.levelno >= logging.ERROR or self._pending >= self.BUFFER_SIZE:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+    def flush(self) -> None:
+        super().flush()
+        self._pending = 0
+
+    def handleError(self, record: logging.LogRecord) -> None:
+        # A failed log write (disk full, file locked) is dropped silently;
+        # library loggers keep the default logging.raiseExceptions handling
+        pass
+
+
+class QuietStreamHandler(logging.StreamHandler):
+    """StreamHandler that drops records it fails to write instead of printing a traceback"""
+
+    def handleError(self, record: logging.LogRecord) -> None:
+        pass
+
+
+class CachingFormatter(logging.Formatter):
+    """
+    Formatter that formats each record once and reuses it across handlers
+
+    The rendered timestamp is also reused for records within the same second.
+    """
+    # (second, datefmt, formatted time) of the last rendered timestamp
+    _time_cache = None
+
+    def format(self, record: logging.LogRecord) -> str:
+        cached = getattr(record, '_cached_format', None)
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        formatted = super().format(record)
+        record._cached_format = (self, formatted)
+        return formatted
+
+    def formatTime(self, record: logging.LogRecord, datefmt: Optional[str] = None) -> str:
+        if datefmt is None:
+            # Default format includes milliseconds; nothing to share
+            return super().formatTime(record, datefmt)
+        second = int(record.created)
+        cached = self._time_cache
+        if cached is not None and cached[0] == second and cached[1] == datefmt:
+            return cached[2]
+        formatted = super().formatTime(record, datefmt)
+        self._time_cache = (second, datefmt, formatted)
+        return formatted
 
 
 def setup_logger(name: str, log_dir: str = "logs") -> logging.Logger:
     """
     Configure logger for ReviAI application
 
+    Each logger name is configured once per process; later calls return
+    the already configured logger unchanged. Pass arguments %-style
+    (logger.debug("x=%s", x)) so messages below the level are never built.
+
     Args:
         name: Logger name
         log_dir: Directory to store log files
@@ -17,41 +141,103 @@ def setup_logger(name: str, log_dir: str = "logs") -> logging.Logger:
     Returns:
         logging.Logger: Configured logger instance
     """
-    # Create logs directory if it doesn't exist
+    # Already configured in this process
+    if name in _listeners:
+        return logging.getLogger(name)
+
     log_path = Path(log_dir)
-    log_path.mkdir(parents=True, exist_ok=True)
 
     # Create logger
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
 
-    # Remove existing handlers to avoid duplicates
-    if logger.handlers:
-        logger.handlers.clear()
-
     # File handler
     log_file = log_path / "app.log"
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
+    file_handler = LazyFileHandler(log_file, encoding='utf-8', delay=True)
     file_handler.setLevel(logging.DEBUG)
 
+    # Batch file writes in memory; ERROR and above flush immediately
+    memory_handler = logging.handlers.MemoryHandler(
+        capacity=512,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True
+    )
+
     # Console handler
-    console_handler = logging.StreamHandler()
+    console_handler = QuietStreamHandler()
     console_handler.setLevel(logging.INFO)
 
     # Formatter
-    formatter = logging.Formatter(
+    formatter = CachingFormatter(
         '[%(asctime)s] [%(levelname)s] %(message)s',
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     file_handler.setFormatter(formatter)
     console_handler.setFormatter(formatter)
 
-    # Add handlers
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Handlers run on a background thread; the caller only enqueues records
+    log_queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(
+        log_queue,
+        memory_handler,
+        console_handler,
+        respect_handler_level=True
+    )
+    listener.start()
+    _listeners[name] = listener
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
     return logger
 
 
+class _ParentDispatchHandler(logging.Handler):
+    """Hand records received from child processes to this process's logger of the same name"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        logging.getLogger(record.name).handle(record)
+
+
+@contextlib.contextmanager
+def forward_child_logs() -> Iterator["multiprocessing.Queue"]:
+    """
+    Collect log records from process pool workers in this process
+
+    Yields a queue to pass to init_child_logging() as the pool initializer
+    argument. Records put on it are written by this process's handlers,
+    so only one process ever appends to logs/app.log. Keep the pool
+    inside the with block so its records are drained before the
+    listener stops.
+
+    Yields:
+        multiprocessing.Queue for the workers' log records
+    """
+    log_queue = multiprocessing.Queue()
+    listener = logging.handlers.QueueListener(log_queue, _ParentDispatchHandler())
+    listener.start()
+    try:
+        yield log_queue
+    finally:
+        listener.stop()
+        log_queue.close()
+
+
+def init_child_logging(log_queue: "multiprocessing.Queue") -> None:
+    """
+    Process pool initializer: send this process's log records to the parent
+
+    Spawned workers re-import this module and would otherwise each buffer
+    and append to the same logs/app.log, which can interleave or overwrite
+    writes on Windows. The workers' own listeners are left idle rather than
+    closed, so a forked worker never flushes the parent's inherited buffers.
+
+    Args:
+        log_queue: Queue from forward_child_logs() in the parent
+    """
+    for name in _listeners:
+        logging.getLogger(name).handlers = [logging.handlers.QueueHandler(log_queue)]
+
+
 # Create default logger instance
 logger = setup_logger('ReviAI')
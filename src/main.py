@@ -9,26 +9,130 @@ warnings.filterwarnings("ignore", message="Couldn't find ffmpeg or avconv")
 warnings.filterwarnings("ignore", category=UserWarning, module="onnxruntime")
 warnings.filterwarnings("ignore", category=RuntimeWarning, module="pydub")
 
+import bisect
+import multiprocessing
+import os
+import queue
+import re
+import subprocess
 import sys
+import webbrowser
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QStackedWidget,
     QVBoxLayout, QHBoxLayout, QFormLayout, QLabel,
     QLineEdit, QPushButton, QTextEdit, QCheckBox,
     QFileDialog, QProgressBar, QMessageBox, QScrollArea,
-    QDialog, QDialogButtonBox, QComboBox, QListWidget, QListWidgetItem,
+    QDialog, QDialogButtonBox, QComboBox, QListWidget, QListWidgetItem, QListView,
     QInputDialog
 )
-from PySide6.QtCore import Qt, QThread, Signal, QUrl
+from PySide6.QtCore import (
+    Qt, QAbstractListModel, QModelIndex, QThread, QThreadPool,
+    QRunnable, QObject, QTimer, QSignalBlocker, Signal
+)
 from PySide6.QtGui import QFont, QDragEnterEvent, QDropEvent
 
 # Import modules
+# step1/step2/step3 pull in xlwings, markitdown/genai and openpyxl; they are
+# imported where first used so the window appears without waiting on them
 from config_manager import ConfigManager
-from models import ReviewTable
-from logger import logger
-import step1_excel_to_pdf as step1
-import step2_ai_review as step2
-import step3_save_results as step3
+from logger import forward_child_logs, logger
+
+
+# Prompt templates live next to this module, independent of the working directory
+PROMPTS_DIR = Path(__file__).resolve().parent / "prompts"
+
+# Label style sheets shared by all dialogs and pages
+_MUTED_STYLE = "color: #666; padding: 10px;"
+_HINT_STYLE = "color: #666; font-size: 10px; padding: 5px;"
+_OK_STYLE = "color: green; font-weight: bold;"
+_ERR_STYLE = "color: red; font-weight: bold;"
+_BUSY_STYLE = "color: blue;"
+_IDLE_STYLE = "color: gray;"
+
+# Restart button text, highlighted so it stands out from the other buttons
+_RESTART_BUTTON_STYLE = "color: blue;"
+
+# Three or more consecutive newlines, collapsed when saving a prompt
+_EXCESS_NEWLINES = re.compile(r'\n{3,}')
+
+# Shared fonts, resolved on first use (QFont needs a running QApplication)
+_MONO_FONT = None
+_TITLE_FONT = None
+
+
+def confirm(parent, title, text):
+    """
+    Ask a Yes/No question, reusing one message box per parent widget
+
+    Returns:
+        bool: True if the user chose Yes
+    """
+    box = getattr(parent, '_confirm_box', None)
+    if box is None:
+        box = parent._confirm_box = QMessageBox(parent)
+        box.setIcon(QMessageBox.Question)
+        box.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+    box.setWindowTitle(title)
+    box.setText(text)
+    box.exec()
+    clicked = box.clickedButton()
+    return clicked is not None and box.standardButton(clicked) == QMessageBox.Yes
+
+
+def mono_font():
+    """Monospace font for prompt text: Consolas, or Courier New if unavailable"""
+    global _MONO_FONT
+    if _MONO_FONT is None:
+        _MONO_FONT = QFont("Consolas", 10)
+        if not _MONO_FONT.exactMatch():
+            _MONO_FONT = QFont("Courier New", 10)
+    return _MONO_FONT
+
+
+def title_font():
+    """Bold 14pt font for page titles"""
+    global _TITLE_FONT
+    if _TITLE_FONT is None:
+        _TITLE_FONT = QFont()
+        _TITLE_FONT.setPointSize(14)
+        _TITLE_FONT.setBold(True)
+    return _TITLE_FONT
+
+
+def scan_prompt_files(prompts_dir):
+    """
+    List prompt templates in a directory with a single os.scandir pass
+
+    Returns:
+        List of (name, path) tuples sorted by name, where name is the
+        file name without the .txt extension
+    """
+    with os.scandir(prompts_dir) as it:
+        return sorted((e.name[:-4], e.path) for e in it if e.name.endswith('.txt') and e.is_file())
+
+
+# (PROMPTS_DIR st_mtime_ns, sorted (name, path) list) of the last
+# PromptManagerDialog listing, reused by the next dialog while unchanged
+_prompt_listing = None
+
+# path -> ((st_mtime_ns, st_size), content) of prompt files read so far
+_prompt_cache = {}
+
+
+def _get_prompt(prompt_path):
+    """Read a prompt file, reusing the cached text while its mtime and size are unchanged"""
+    st = os.stat(prompt_path)
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _prompt_cache.get(prompt_path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with open(prompt_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    _prompt_cache[prompt_path] = (key, content)
+    return content
 
 
 # Custom drag-drop widgets
@@ -38,6 +142,8 @@ class DragDropLineEdit(QLineEdit):
         super().__init__(parent)
         self.setAcceptDrops(True)
         self.file_filter = file_filter  # e.g., ".xlsx", ".pdf"
+        # Lower-cased suffixes (without the dot) for a per-file set lookup
+        self._ext_set = frozenset((file_filter.lower().lstrip('.'),))
         self.setPlaceholderText("ファイルをドラッグ＆ドロップまたはクリックして選択")
 
     def dragEnterEvent(self, event: QDragEnterEvent):
@@ -51,7 +157,7 @@ class DragDropLineEdit(QLineEdit):
         if files:
             # Filter by extension if specified
             if self.file_filter != "*":
-                valid_files = [f for f in files if f.lower().endswith(self.file_filter.lower())]
+                valid_files = [f for f in files if os.path.splitext(f)[1][1:].lower() in self._ext_set]
                 if valid_files:
                     self.setText(valid_files[0])  # Use first valid file
                 else:
@@ -64,13 +170,21 @@ class DragDropLineEdit(QLineEdit):
                 self.setText(files[0])
 
 
-class DragDropListWidget(QListWidget):
-    """ListWidget with drag and drop support for files"""
+class DragDropListView(QListView):
+    """ListView with drag and drop support for files"""
     def __init__(self, parent=None, file_filter="*"):
         super().__init__(parent)
         self.setAcceptDrops(True)
         self.file_filter = file_filter  # e.g., ".pdf", or list like [".pdf", ".md"]
         self.parent_widget = parent
+        # Support both single string and list of extensions; lower-cased
+        # suffixes (without the dot) for a per-file set lookup
+        if isinstance(file_filter, str):
+            self._ext_set = frozenset((file_filter.lower().lstrip('.'),))
+            self._supported_formats = file_filter
+        else:  # List of extensions
+            self._ext_set = frozenset(ext.lower().lstrip('.') for ext in file_filter)
+            self._supported_formats = ", ".join(file_filter)
 
     def dragEnterEvent(self, event: QDragEnterEvent):
         if event.mimeData().hasUrls():
@@ -78,19 +192,20 @@ class DragDropListWidget(QListWidget):
         else:
             event.ignore()
 
+    def dragMoveEvent(self, event):
+        # QListView only accepts drops the model supports; file URLs go to the parent
+        if event.mimeData().hasUrls():
+            event.acceptProposedAction()
+        else:
+            event.ignore()
+
     def dropEvent(self, event: QDropEvent):
         files = [url.toLocalFile() for url in event.mimeData().urls()]
         if files:
             # Filter by extension
             if self.file_filter != "*":
-                # Support both single string and list of extensions
-                if isinstance(self.file_filter, str):
-                    valid_files = [f for f in files if f.lower().endswith(self.file_filter.lower())]
-                    supported_formats = self.file_filter
-                else:  # List of extensions
-                    valid_files = [f for f in files
-                                   if any(f.lower().endswith(ext.lower()) for ext in self.file_filter)]
-                    supported_formats = ", ".join(self.file_filter)
+                valid_files = [f for f in files if os.path.splitext(f)[1][1:].lower() in self._ext_set]
+                supported_formats = self._supported_formats
             else:
                 valid_files = files
                 supported_formats = "*"
@@ -107,76 +222,253 @@ class DragDropListWidget(QListWidget):
                 )
 
 
-class SheetLoaderWorker(QThread):
-    """Worker thread for loading Excel sheets to prevent UI freezing"""
-    finished = Signal(list)
+class PdfFileListModel(QAbstractListModel):
+    """
+    List model showing file names for a list of paths
+
+    The model works on the list passed in, so the owner's list and the view
+    stay in step as long as changes go through these methods. An empty list
+    is shown as a single non-selectable placeholder row.
+    """
+    EMPTY_TEXT = "（PDFファイルがありません）"
+
+    def __init__(self, files, parent=None):
+        super().__init__(parent)
+        self._files = files
+        self._names = [os.path.basename(p) for p in files]  # Display names, by row
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._files) or 1
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if not self._files:
+            return self.EMPTY_TEXT if role == Qt.DisplayRole else None
+        if role == Qt.DisplayRole:
+            return self._names[index.row()]
+        if role == Qt.ToolTipRole:
+            return self._files[index.row()]  # Show full path on hover
+        return None
+
+    def flags(self, index):
+        if not self._files:
+            return Qt.ItemIsEnabled  # Placeholder row is not selectable
+        return super().flags(index)
+
+    def set_files(self, files):
+        """Replace all paths"""
+        self.beginResetModel()
+        self._files[:] = files
+        self._names = [os.path.basename(p) for p in self._files]
+        self.endResetModel()
+
+    def append_files(self, files):
+        """Append paths after the existing rows"""
+        if not files:
+            return
+        if not self._files:
+            # The placeholder row becomes the first file; only the rest are inserted
+            names = [os.path.basename(p) for p in files]
+            if len(files) > 1:
+                self.beginInsertRows(QModelIndex(), 1, len(files) - 1)
+                self._files.extend(files)
+                self._names.extend(names)
+                self.endInsertRows()
+            else:
+                self._files.extend(files)
+                self._names.extend(names)
+            first_row = self.index(0)
+            self.dataChanged.emit(first_row, first_row)
+            return
+        first = len(self._files)
+        self.beginInsertRows(QModelIndex(), first, first + len(files) - 1)
+        self._files.extend(files)
+        self._names.extend(os.path.basename(p) for p in files)
+        self.endInsertRows()
+
+    def remove_row(self, row):
+        """
+        Remove the path at row
+
+        Returns:
+            str: Removed path
+        """
+        if len(self._files) == 1:
+            # The last row stays and turns back into the placeholder
+            removed = self._files.pop()
+            self._names.pop()
+            first_row = self.index(0)
+            self.dataChanged.emit(first_row, first_row)
+            return removed
+        self.beginRemoveRows(QModelIndex(), row, row)
+        removed = self._files.pop(row)
+        del self._names[row]
+        self.endRemoveRows()
+        return removed
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by pool workers (QRunnable is not a QObject)"""
+    finished = Signal(object)
     error = Signal(str)
+    progress = Signal(str)
+    # (done, total) for workers that can report determinate progress
+    progress_value = Signal(int, int)
+
 
+class SheetLoaderWorker(QRunnable):
+    """Pool task for loading Excel sheets to prevent UI freezing"""
     def __init__(self, excel_path):
         super().__init__()
+        self.signals = WorkerSignals()
         self.excel_path = excel_path
 
     def run(self):
         try:
+            import step1_excel_to_pdf as step1
             sheets = step1.list_all_sheets(self.excel_path)
-            self.finished.emit(sheets)
+            self.signals.finished.emit(sheets)
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit(str(e))
 
 
-class PDFGeneratorWorker(QThread):
-    """Worker thread for PDF generation to prevent UI freezing"""
-    finished = Signal(list)
-    error = Signal(str)
-    progress = Signal(str)
-
-    def __init__(self, excel_path, sheet_names, version, output_dir):
+class PDFGeneratorWorker(QRunnable):
+    """Pool task for PDF generation to prevent UI freezing"""
+    def __init__(self, excel_path, sheet_names, version, output_dir, backend="excel", force=False):
         super().__init__()
+        self.signals = WorkerSignals()
         self.excel_path = excel_path
         self.sheet_names = sheet_names
         self.version = version
         self.output_dir = output_dir
+        self.backend = backend
+        self.force = force
 
     def run(self):
         try:
-            self.progress.emit("PDF生成中...")
-            pdf_files = step1.generate_pdfs(
-                self.excel_path,
-                self.sheet_names,
-                self.version,
-                self.output_dir
+            self.signals.progress.emit("PDF生成中...")
+            import step1_excel_to_pdf as step1
+            if self.backend != "excel":
+                # Other backends export every sheet in one in-process pass
+                pdf_files = step1.generate_pdfs(
+                    self.excel_path, self.sheet_names, self.version, self.output_dir,
+                    backend=self.backend, force=self.force
+                )
+                self.signals.progress_value.emit(len(self.sheet_names), len(self.sheet_names))
+                self.signals.finished.emit(pdf_files)
+                return
+
+            output_path = step1.prepare_pdf_output(self.excel_path, self.output_dir)
+
+            # Up-to-date PDFs are reported right away; processes (and Excel)
+            # are only started for the sheets that still need exporting
+            total = len(self.sheet_names)
+            pdf_by_sheet = step1.up_to_date_pdfs(
+                self.excel_path, self.sheet_names, self.version, output_path, self.force
             )
-            self.finished.emit(pdf_files)
+            for pdf_path in pdf_by_sheet.values():
+                logger.info(f"Skipping up-to-date PDF: {Path(pdf_path).name}")
+            pending = [name for name in self.sheet_names if name not in pdf_by_sheet]
+            done = len(pdf_by_sheet)
+            if done:
+                self.signals.progress.emit(f"PDF生成中... {done}/{total}")
+                self.signals.progress_value.emit(done, total)
+
+            if pending:
+                # Excel's COM server is single-threaded, so scale with processes;
+                # each process starts one Excel instance and exports a group of sheets
+                max_workers = max(1, min((os.cpu_count() or 2) // 2, len(pending)))
+                groups = [pending[i::max_workers] for i in range(max_workers)]
+                logger.info(f"Starting PDF generation for {len(pending)} sheets ({max_workers} processes)")
+
+                # Each process reports every finished sheet on this queue
+                progress_queue = multiprocessing.Queue()
+                finished_sheets = set(pdf_by_sheet)
+                # Workers log through the parent so only one process writes app.log
+                with forward_child_logs() as log_queue, ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    initializer=step1.init_render_process,
+                    initargs=(progress_queue, log_queue)
+                ) as executor:
+                    # force=True: freshness was already checked above
+                    futures = {
+                        executor.submit(
+                            step1.render_sheet_pdfs,
+                            self.excel_path,
+                            group,
+                            self.version,
+                            self.output_dir,
+                            True
+                        ): group
+                        for group in groups
+                    }
+                    running = set(futures)
+                    while running:
+                        finished, running = wait(running, timeout=0.2, return_when=FIRST_COMPLETED)
+                        while True:
+                            try:
+                                finished_sheets.add(progress_queue.get_nowait())
+                            except queue.Empty:
+                                break
+                        for future in finished:
+                            group = futures[future]
+                            try:
+                                pdf_by_sheet.update(future.result())
+                            except Exception as e:
+                                # Continue with other groups instead of stopping
+                                logger.error(f"Failed to generate PDFs for sheets {group}: {str(e)}")
+                            # A group that failed early never reported its sheets
+                            finished_sheets.update(group)
+                        if len(finished_sheets) != done:
+                            done = len(finished_sheets)
+                            self.signals.progress.emit(f"PDF生成中... {done}/{total}")
+                            self.signals.progress_value.emit(done, total)
+
+            # Keep the selected sheet order regardless of completion order
+            pdf_files = [pdf_by_sheet[name] for name in self.sheet_names if name in pdf_by_sheet]
+            logger.info(f"PDF generation complete. Generated {len(pdf_files)}/{total} files")
+            self.signals.finished.emit(pdf_files)
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit(str(e))
 
 
-class AIReviewWorker(QThread):
-    """Worker thread for AI review to prevent UI freezing"""
-    finished = Signal(ReviewTable)
-    error = Signal(str)
-    progress = Signal(str)
-
-    def __init__(self, pdf_paths, prompt, api_key, model):
+class AIReviewWorker(QRunnable):
+    """Pool task for AI review to prevent UI freezing"""
+    def __init__(self, pdf_paths, prompt_path, api_key, model, debug=False):
         super().__init__()
+        self.signals = WorkerSignals()
         self.pdf_paths = pdf_paths
-        self.prompt = prompt
+        self.prompt_path = prompt_path
         self.api_key = api_key
         self.model = model
+        self.debug = debug
 
     def run(self):
         try:
-            self.progress.emit("AI評審を開始しています...")
+            self.signals.progress.emit("プロンプト読込中...")
+            try:
+                prompt = _get_prompt(self.prompt_path)
+            except FileNotFoundError:
+                raise FileNotFoundError(f"プロンプトファイルが見つかりません:\n{self.prompt_path}")
+            if not prompt.strip():
+                raise ValueError("プロンプトが空です\n\n「管理」ボタンからプロンプトを編集してください")
+
+            self.signals.progress.emit("AI評審を開始しています...")
+            import step2_ai_review as step2
             result = step2.review_with_retry(
                 self.pdf_paths,
-                self.prompt,
+                prompt,
                 self.api_key,
                 self.model,
-                max_retries=3
+                max_retries=3,
+                debug=self.debug
             )
-            self.finished.emit(result)
+            self.signals.finished.emit(result)
         except Exception as e:
-            self.error.emit(str(e))
+            self.signals.error.emit(str(e))
 
 
 class APIKeyDialog(QDialog):
@@ -193,7 +485,7 @@ class APIKeyDialog(QDialog):
             "Gemini API Keyを入力してください\n"
             "API Keyをお持ちでない場合は、下のボタンから取得できます"
         )
-        info_label.setStyleSheet("color: #666; padding: 10px;")
+        info_label.setStyleSheet(_MUTED_STYLE)
         layout.addWidget(info_label)
 
         # API Key input
@@ -239,7 +531,6 @@ class APIKeyDialog(QDialog):
 
     def open_help(self):
         """Open API key help URL"""
-        import webbrowser
         webbrowser.open("https://aistudio.google.com/apikey")
 
     def get_api_key(self):
@@ -254,10 +545,22 @@ class PromptManagerDialog(QDialog):
         self.setWindowTitle("プロンプトテンプレート管理")
         self.setMinimumSize(900, 600)
 
-        self.prompts_dir = Path("./prompts")
+        self.prompts_dir = PROMPTS_DIR
         self.prompts_dir.mkdir(exist_ok=True)
         self.selected_prompt = None
 
+        # Sorted (name, path) list shown in prompt_list
+        self._prompt_files = []
+        # Prompt name -> list row, rebuilt by load_prompt_list
+        self._name_to_row = {}
+
+        # Preview is loaded once the selection settles
+        self._pending_preview = None
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(80)
+        self._preview_timer.timeout.connect(self._load_preview_now)
+
         self.init_ui()
         self.load_prompt_list()
 
@@ -271,7 +574,7 @@ class PromptManagerDialog(QDialog):
 
         self.prompt_list = QListWidget()
         self.prompt_list.setMaximumWidth(300)
-        self.prompt_list.itemClicked.connect(self.on_prompt_selected)
+        self.prompt_list.itemClicked.connect(self.schedule_preview)
         self.prompt_list.itemDoubleClicked.connect(self.edit_prompt)
         left_panel.addWidget(self.prompt_list)
 
@@ -309,7 +612,7 @@ class PromptManagerDialog(QDialog):
 
         self.preview_text = QTextEdit()
         self.preview_text.setReadOnly(True)
-        self.preview_text.setFont(QFont("Consolas", 10))
+        self.preview_text.setFont(mono_font())
         right_panel.addWidget(self.preview_text)
 
         layout.addLayout(right_panel)
@@ -327,10 +630,16 @@ class PromptManagerDialog(QDialog):
 
     def load_prompt_list(self):
         """Load all saved prompts"""
+        global _prompt_listing
         self.prompt_list.clear()
 
-        # Load all prompts from prompts directory
-        prompt_files = sorted(self.prompts_dir.glob("*.txt"))
+        # Reuse the last dialog's listing while the directory is unchanged
+        dir_mtime = os.stat(self.prompts_dir).st_mtime_ns
+        if _prompt_listing is not None and _prompt_listing[0] == dir_mtime:
+            prompt_files = list(_prompt_listing[1])
+        else:
+            # Load all prompts from prompts directory
+            prompt_files = scan_prompt_files(self.prompts_dir)
 
         if not prompt_files:
             # Create a default prompt if none exists
@@ -340,21 +649,86 @@ class PromptManagerDialog(QDialog):
             default_file = self.prompts_dir / "標準テンプレート.txt"
             with open(default_file, 'w', encoding='utf-8') as f:
                 f.write(default_prompt)
-            prompt_files = [default_file]
+            prompt_files = [(default_file.stem, str(default_file))]
             logger.info(f"Created default prompt: {default_file}")
+            dir_mtime = os.stat(self.prompts_dir).st_mtime_ns
+
+        self._prompt_files = prompt_files
+        _prompt_listing = (dir_mtime, list(prompt_files))
 
-        for prompt_file in prompt_files:
-            item = QListWidgetItem(prompt_file.stem)
-            item.setData(Qt.UserRole, str(prompt_file))
+        self.prompt_list.setUpdatesEnabled(False)
+        for prompt_name, prompt_path in prompt_files:
+            item = QListWidgetItem(prompt_name)
+            item.setData(Qt.UserRole, prompt_path)
             self.prompt_list.addItem(item)
+        self.prompt_list.setUpdatesEnabled(True)
+        self._index_rows()
+
+    def _index_rows(self):
+        """Rebuild the name -> row map from the current listing"""
+        self._name_to_row = {name: row for row, (name, _) in enumerate(self._prompt_files)}
+
+    def _remember_listing(self):
+        """Store the current listing for later dialogs under the new directory mtime"""
+        global _prompt_listing
+        _prompt_listing = (os.stat(self.prompts_dir).st_mtime_ns, list(self._prompt_files))
+
+    def _add_prompt_item(self, name, path):
+        """
+        Insert a prompt into the list at its sorted position
+
+        Returns:
+            int: Row of the prompt (its existing row if the name is already listed)
+        """
+        row = self._name_to_row.get(name)
+        if row is not None:
+            return row
+
+        prompt_files = self._prompt_files
+        entry = (name, str(path))
+        row = bisect.bisect_left(prompt_files, entry)
+        prompt_files.insert(row, entry)
+
+        item = QListWidgetItem(name)
+        item.setData(Qt.UserRole, str(path))
+        self.prompt_list.insertItem(row, item)
+
+        self._remember_listing()
+        self._index_rows()
+        return row
+
+    def _remove_prompt_item(self, row):
+        """Remove the prompt at row from the list and drop its cached text"""
+        _, path = self._prompt_files.pop(row)
+        _prompt_cache.pop(path, None)
+        self.prompt_list.takeItem(row)
+
+        self._remember_listing()
+        self._index_rows()
+
+    def schedule_preview(self, item):
+        """Preview the clicked prompt after a short delay, coalescing rapid clicks"""
+        self._pending_preview = item.data(Qt.UserRole)
+        self._preview_timer.start()
+
+    def _load_preview_now(self):
+        """Load the preview scheduled by schedule_preview"""
+        prompt_path = self._pending_preview
+        self._pending_preview = None
+        if prompt_path is not None:
+            self.show_preview(prompt_path)
 
     def on_prompt_selected(self, item):
         """Preview selected prompt"""
-        prompt_path = item.data(Qt.UserRole)
+        # An immediate load supersedes any pending delayed one
+        self._preview_timer.stop()
+        self._pending_preview = None
+        self.show_preview(item.data(Qt.UserRole))
 
+    def show_preview(self, prompt_path):
+        """Show a prompt's content in the preview pane and mark it selected"""
         try:
-            with open(prompt_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = _get_prompt(prompt_path)
 
             self.preview_text.setText(content)
             self.selected_prompt = prompt_path
@@ -379,8 +753,9 @@ class PromptManagerDialog(QDialog):
                     file_path = self.prompts_dir / f"{name}.txt"
                     with open(file_path, 'w', encoding='utf-8') as f:
                         f.write(content)
+                    _prompt_cache.pop(str(file_path), None)
 
-                    self.load_prompt_list()
+                    self._add_prompt_item(name, file_path)
                     QMessageBox.information(self, "成功", f"プロンプト '{name}' を作成しました")
 
     def edit_prompt(self):
@@ -394,8 +769,7 @@ class PromptManagerDialog(QDialog):
 
         try:
             # Load current content
-            with open(prompt_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            content = _get_prompt(prompt_path)
 
             # Open editor
             dialog = PromptEditorDialog(self, content)
@@ -404,6 +778,7 @@ class PromptManagerDialog(QDialog):
                 if new_content.strip():
                     with open(prompt_path, 'w', encoding='utf-8') as f:
                         f.write(new_content)
+                    _prompt_cache.pop(prompt_path, None)
 
                     self.preview_text.setText(new_content)
                     QMessageBox.information(self, "成功", "プロンプトを更新しました")
@@ -435,22 +810,20 @@ class PromptManagerDialog(QDialog):
                     return
 
                 old_path.rename(new_file)
+                _prompt_cache.pop(str(old_path), None)
 
                 # Update current selection
                 if self.selected_prompt == str(old_path):
                     self.selected_prompt = str(new_file)
 
-                # Reload list and clear preview
-                self.load_prompt_list()
+                # Move the entry to its new sorted position and clear preview
+                self._remove_prompt_item(self.prompt_list.row(current_item))
                 self.preview_text.clear()
 
                 # Select the renamed item
-                for i in range(self.prompt_list.count()):
-                    item = self.prompt_list.item(i)
-                    if item.text() == name:
-                        self.prompt_list.setCurrentItem(item)
-                        self.on_prompt_selected(item)
-                        break
+                row = self._add_prompt_item(name, new_file)
+                self.prompt_list.setCurrentRow(row)
+                self.on_prompt_selected(self.prompt_list.item(row))
 
                 QMessageBox.information(self, "成功", f"プロンプト名を '{name}' に変更しました")
             except Exception as e:
@@ -474,15 +847,15 @@ class PromptManagerDialog(QDialog):
 
             try:
                 # Load source content
-                with open(prompt_path, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                content = _get_prompt(prompt_path)
 
                 # Save with new name
                 new_file = self.prompts_dir / f"{name}.txt"
                 with open(new_file, 'w', encoding='utf-8') as f:
                     f.write(content)
+                _prompt_cache.pop(str(new_file), None)
 
-                self.load_prompt_list()
+                self._add_prompt_item(name, new_file)
                 QMessageBox.information(self, "成功", f"プロンプト '{name}' を作成しました")
             except Exception as e:
                 QMessageBox.critical(self, "エラー", f"複製失敗:\n{str(e)}")
@@ -497,7 +870,7 @@ class PromptManagerDialog(QDialog):
         prompt_path = current_item.data(Qt.UserRole)
 
         # Check if this is the last prompt
-        prompt_count = len(list(self.prompts_dir.glob("*.txt")))
+        prompt_count = len(scan_prompt_files(self.prompts_dir))
         if prompt_count <= 1:
             QMessageBox.warning(
                 self,
@@ -506,22 +879,18 @@ class PromptManagerDialog(QDialog):
             )
             return
 
-        reply = QMessageBox.question(
-            self,
-            "確認",
-            f"プロンプト '{current_item.text()}' を削除しますか？\n\n(残り {prompt_count - 1} 個のプロンプト)",
-            QMessageBox.Yes | QMessageBox.No
-        )
+        reply = confirm(self, "確認", f"プロンプト '{current_item.text()}' を削除しますか？\n\n(残り {prompt_count - 1} 個のプロンプト)")
 
-        if reply == QMessageBox.Yes:
+        if reply:
             try:
                 Path(prompt_path).unlink()
+                _prompt_cache.pop(prompt_path, None)
 
                 # Clear selection
                 self.selected_prompt = None
 
-                # Reload list
-                self.load_prompt_list()
+                # Remove the entry
+                self._remove_prompt_item(self.prompt_list.row(current_item))
                 self.preview_text.clear()
 
                 # Auto-select first item
@@ -536,6 +905,10 @@ class PromptManagerDialog(QDialog):
 
     def get_selected_prompt_path(self):
         """Get selected prompt file path"""
+        # Apply a click whose preview hasn't loaded yet
+        if self._preview_timer.isActive():
+            self._preview_timer.stop()
+            self._load_preview_now()
         return self.selected_prompt
 
 
@@ -553,7 +926,7 @@ class PromptEditorDialog(QDialog):
             "[ヒント] Ctrl+A (全選択) → 貼り付けで既存内容を置換できます\n"
             "保存時に余分な空行は自動的に削除されます"
         )
-        info_label.setStyleSheet("color: #666; font-size: 10px; padding: 5px;")
+        info_label.setStyleSheet(_HINT_STYLE)
         layout.addWidget(info_label)
 
         # Text editor with better settings
@@ -564,18 +937,18 @@ class PromptEditorDialog(QDialog):
         self.text_edit.setTabStopDistance(40)  # Set tab width
 
         # Set monospace font for better formatting visibility
-        from PySide6.QtGui import QFont
-        font = QFont("Consolas", 10)
-        if not font.exactMatch():
-            font = QFont("Courier New", 10)
-        self.text_edit.setFont(font)
+        self.text_edit.setFont(mono_font())
 
         layout.addWidget(self.text_edit)
 
-        # Character count
+        # Character count (recomputed once typing pauses)
         self.char_count_label = QLabel("")
         self.update_char_count()
-        self.text_edit.textChanged.connect(self.update_char_count)
+        self._count_timer = QTimer(self)
+        self._count_timer.setSingleShot(True)
+        self._count_timer.setInterval(100)
+        self._count_timer.timeout.connect(self.update_char_count)
+        self.text_edit.textChanged.connect(self._count_timer.start)
         layout.addWidget(self.char_count_label)
 
         # Buttons
@@ -590,19 +963,17 @@ class PromptEditorDialog(QDialog):
 
     def update_char_count(self):
         """Update character count"""
-        text = self.text_edit.toPlainText()
-        lines = len(text.split('\n'))
-        chars = len(text)
+        # Read counts from the document instead of copying its text;
+        # characterCount() includes one trailing paragraph separator
+        document = self.text_edit.document()
+        lines = document.blockCount()
+        chars = document.characterCount() - 1
         self.char_count_label.setText(f"行数: {lines} | 文字数: {chars}")
 
     def get_prompt(self):
         """Get prompt text with normalized line breaks"""
-        text = self.text_edit.toPlainText()
-        # Normalize line breaks: remove excessive empty lines (more than 2 consecutive)
-        import re
-        # Replace 3+ consecutive newlines with just 2
-        text = re.sub(r'\n{3,}', '\n\n', text)
-        return text
+        # Normalize line breaks: replace 3+ consecutive newlines with just 2
+        return _EXCESS_NEWLINES.sub('\n\n', self.text_edit.toPlainText())
 
 
 class Step1Page(QWidget):
@@ -611,9 +982,11 @@ class Step1Page(QWidget):
         super().__init__()
         self.controller = controller
         self.excel_path = None
-        self.sheet_checkboxes = []
+        self.sheet_checkboxes = []  # Reused across reloads; only the first sheet_count are shown
+        self.sheet_count = 0
         self.sheet_loader_worker = None
         self.pdf_generator_worker = None
+        self._last_version = None  # Version number parsed for the running PDF generation
         self.generated_pdf_files = []
 
         self.init_ui()
@@ -623,10 +996,7 @@ class Step1Page(QWidget):
 
         # Title
         title = QLabel("第1段階: Excel→PDF生成")
-        title_font = QFont()
-        title_font.setPointSize(14)
-        title_font.setBold(True)
-        title.setFont(title_font)
+        title.setFont(title_font())
         layout.addWidget(title)
 
         # Form
@@ -672,6 +1042,14 @@ class Step1Page(QWidget):
         self.version_input.setPlaceholderText("例: 6")
         form.addRow("バージョン番号:", self.version_input)
 
+        # PDFs newer than the workbook are reused unless this is checked
+        self.force_checkbox = QCheckBox("既存のPDFも再生成する")
+        self.force_checkbox.setToolTip(
+            "Excelファイルより新しいPDFは通常スキップされます。\n"
+            "外部リンク先や印刷設定だけを変更した場合はチェックしてください。"
+        )
+        form.addRow("", self.force_checkbox)
+
         layout.addLayout(form)
 
         # Generate button
@@ -700,10 +1078,14 @@ class Step1Page(QWidget):
     def on_excel_file_changed(self):
         """Handle Excel file selection (from drag-drop or browse)"""
         file_path = self.file_input.text()
-        if file_path and Path(file_path).exists():
+        # Same workbook echoed back (e.g. re-dropped); sheets are already loaded
+        if file_path == self.excel_path:
+            return
+        # A missing file surfaces through the sheet loader's error signal
+        if file_path:
             self.excel_path = file_path
             self.load_sheets()
-            logger.info(f"Excel file selected: {Path(file_path).name}")
+            logger.info(f"Excel file selected: {os.path.basename(file_path)}")
 
     def browse_excel(self):
         """Open file dialog to select Excel file"""
@@ -718,31 +1100,53 @@ class Step1Page(QWidget):
 
     def load_sheets(self):
         """Load and display all sheets from Excel file using background thread"""
-        # Clear old checkboxes
-        for cb in self.sheet_checkboxes:
-            cb.deleteLater()
-        self.sheet_checkboxes.clear()
+        # Hide old checkboxes
+        self.hide_sheet_checkboxes()
 
         # Show loading indicator
         self.sheet_loading_label.setText("[読込中] シートを読み込み中...")
-        self.sheet_loading_label.setStyleSheet("color: blue;")
+        self.sheet_loading_label.setStyleSheet(_BUSY_STYLE)
 
-        # Create worker thread
+        # Run on the shared thread pool
         self.sheet_loader_worker = SheetLoaderWorker(self.excel_path)
-        self.sheet_loader_worker.finished.connect(self.on_sheets_loaded)
-        self.sheet_loader_worker.error.connect(self.on_sheets_load_error)
-        self.sheet_loader_worker.start()
+        self.sheet_loader_worker.signals.finished.connect(self.on_sheets_loaded)
+        self.sheet_loader_worker.signals.error.connect(self.on_sheets_load_error)
+        self.controller.thread_pool.start(self.sheet_loader_worker)
+
+    def hide_sheet_checkboxes(self):
+        """Uncheck and hide all pooled sheet checkboxes"""
+        self.sheet_scroll.setUpdatesEnabled(False)
+        for cb in self.sheet_checkboxes[:self.sheet_count]:
+            cb.setChecked(False)
+            cb.hide()
+        self.sheet_count = 0
+        self.sheet_scroll.setUpdatesEnabled(True)
 
     def on_sheets_loaded(self, sheets):
         """Handle successful sheet loading"""
         # Hide loading indicator
         self.sheet_loading_label.setText("")
 
-        # Create checkboxes
-        for sheet_name in sheets:
-            cb = QCheckBox(sheet_name)
-            self.sheet_layout.addWidget(cb)
-            self.sheet_checkboxes.append(cb)
+        # Relabel pooled checkboxes, creating new ones only when needed,
+        # with one layout pass for the whole batch
+        self.sheet_scroll.setUpdatesEnabled(False)
+        self.sheet_widget.hide()
+        for i, sheet_name in enumerate(sheets):
+            if i < len(self.sheet_checkboxes):
+                cb = self.sheet_checkboxes[i]
+                cb.setText(sheet_name)
+                cb.setChecked(False)
+                cb.show()
+            else:
+                cb = QCheckBox(sheet_name)
+                self.sheet_layout.addWidget(cb)
+                self.sheet_checkboxes.append(cb)
+        for cb in self.sheet_checkboxes[len(sheets):]:
+            cb.setChecked(False)
+            cb.hide()
+        self.sheet_count = len(sheets)
+        self.sheet_widget.show()
+        self.sheet_scroll.setUpdatesEnabled(True)
 
         logger.info(f"Loaded {len(sheets)} sheets")
 
@@ -753,22 +1157,16 @@ class Step1Page(QWidget):
 
     def clear_all(self):
         """Clear all inputs and reset to initial state"""
-        reply = QMessageBox.question(
-            self,
-            "確認",
-            "すべての入力をクリアしますか？",
-            QMessageBox.Yes | QMessageBox.No
-        )
+        reply = confirm(self, "確認", "すべての入力をクリアしますか？")
 
-        if reply == QMessageBox.Yes:
+        if reply:
             # Clear file selection
             self.excel_path = None
-            self.file_input.clear()
+            with QSignalBlocker(self.file_input):
+                self.file_input.clear()
 
             # Clear sheet checkboxes
-            for cb in self.sheet_checkboxes:
-                cb.deleteLater()
-            self.sheet_checkboxes.clear()
+            self.hide_sheet_checkboxes()
             self.sheet_loading_label.setText("")
 
             # Clear version input
@@ -790,7 +1188,7 @@ class Step1Page(QWidget):
             return
 
         selected_sheets = [
-            cb.text() for cb in self.sheet_checkboxes if cb.isChecked()
+            cb.text() for cb in self.sheet_checkboxes[:self.sheet_count] if cb.isChecked()
         ]
         if not selected_sheets:
             QMessageBox.warning(self, "エラー", "シートを選択してください")
@@ -800,31 +1198,45 @@ class Step1Page(QWidget):
         if not version.isdigit():
             QMessageBox.warning(self, "エラー", "バージョン番号は数字で入力してください")
             return
+        self._last_version = int(version)
 
         # Disable button and show progress
         self.generate_btn.setEnabled(False)
         self.pdf_progress.setVisible(True)
-        self.pdf_progress.setRange(0, 0)  # Indeterminate mode
+        self.pdf_progress.setRange(0, len(selected_sheets))
+        self.pdf_progress.setValue(0)
         self.pdf_status_label.setText("PDF生成中...")
-        self.pdf_status_label.setStyleSheet("color: blue;")
+        self.pdf_status_label.setStyleSheet(_BUSY_STYLE)
 
-        # Generate PDFs in background thread
+        # Generate PDFs on the shared thread pool
         output_dir = "./output/pdfs"
+        try:
+            backend = ConfigManager.get('Settings', 'pdf_backend', default='excel')
+        except FileNotFoundError:
+            backend = 'excel'
         self.pdf_generator_worker = PDFGeneratorWorker(
             self.excel_path,
             selected_sheets,
-            int(version),
-            output_dir
+            self._last_version,
+            output_dir,
+            backend,
+            self.force_checkbox.isChecked()
         )
-        self.pdf_generator_worker.finished.connect(self.on_pdfs_generated)
-        self.pdf_generator_worker.error.connect(self.on_pdf_generation_error)
-        self.pdf_generator_worker.progress.connect(self.on_pdf_progress)
-        self.pdf_generator_worker.start()
+        self.pdf_generator_worker.signals.finished.connect(self.on_pdfs_generated)
+        self.pdf_generator_worker.signals.error.connect(self.on_pdf_generation_error)
+        self.pdf_generator_worker.signals.progress.connect(self.on_pdf_progress)
+        self.pdf_generator_worker.signals.progress_value.connect(self.on_pdf_progress_value)
+        self.controller.thread_pool.start(self.pdf_generator_worker)
 
     def on_pdf_progress(self, message):
         """Update PDF generation progress"""
         self.pdf_status_label.setText(message)
 
+    def on_pdf_progress_value(self, done, total):
+        """Advance the PDF progress bar as sheets complete"""
+        self.pdf_progress.setRange(0, total)
+        self.pdf_progress.setValue(done)
+
     def on_pdfs_generated(self, pdf_files):
         """Handle successful PDF generation"""
         # Reset UI
@@ -835,27 +1247,20 @@ class Step1Page(QWidget):
         self.generated_pdf_files = pdf_files
 
         # Save version number to controller for Step3
-        version = self.version_input.text()
-        if version.isdigit():
-            self.controller.version_number = int(version)
-            logger.info(f"Saved version number for Step3: {version}")
+        self.controller.version_number = self._last_version
+        logger.info(f"Saved version number for Step3: {self._last_version}")
 
         # Display simple success message
         self.pdf_status_label.setText(f"[完了] PDF生成完了 ({len(pdf_files)}個)")
-        self.pdf_status_label.setStyleSheet("color: green; font-weight: bold;")
+        self.pdf_status_label.setStyleSheet(_OK_STYLE)
 
         # Save paths for next step
         self.controller.step2_page.set_pdf_files(pdf_files)
 
         # Ask user if they want to open the PDFs
-        reply = QMessageBox.question(
-            self,
-            "完了",
-            f"{len(pdf_files)}個のPDFファイルを生成しました\n\n生成されたPDFファイルを開きますか？",
-            QMessageBox.Yes | QMessageBox.No
-        )
+        reply = confirm(self, "完了", f"{len(pdf_files)}個のPDFファイルを生成しました\n\n生成されたPDFファイルを開きますか？")
 
-        if reply == QMessageBox.Yes:
+        if reply:
             self.open_generated_pdfs()
 
     def on_pdf_generation_error(self, error_msg):
@@ -863,15 +1268,12 @@ class Step1Page(QWidget):
         self.generate_btn.setEnabled(True)
         self.pdf_progress.setVisible(False)
         self.pdf_status_label.setText("[失敗] PDF生成失敗")
-        self.pdf_status_label.setStyleSheet("color: red; font-weight: bold;")
+        self.pdf_status_label.setStyleSheet(_ERR_STYLE)
         QMessageBox.critical(self, "エラー", f"PDF生成失敗:\n{error_msg}")
         logger.error(f"PDF generation error: {error_msg}")
 
     def open_generated_pdfs(self):
         """Open generated PDF files in default viewer"""
-        import os
-        import subprocess
-
         for pdf_path in self.generated_pdf_files:
             try:
                 # Use os.startfile on Windows to open with default application
@@ -889,14 +1291,34 @@ class Step1Page(QWidget):
 
 class Step2Page(QWidget):
     """Step 2: AI Review"""
+    _MODEL_DESCRIPTIONS = {
+        "gemini-2.5-pro": "最高品質（処理時間: 長い、503エラーの可能性: 高い）",
+        "gemini-2.0-flash-exp": "高速・実験版（処理時間: 短い、503エラーの可能性: 低い）",
+        "gemini-1.5-pro": "バランス型（処理時間: 中、503エラーの可能性: 中）",
+        "gemini-1.5-flash": "最速（処理時間: 最短、503エラーの可能性: 最低）"
+    }
+
     def __init__(self, controller):
         super().__init__()
         self.controller = controller
         self.pdf_files = []
+        self._pdf_set = set()  # Same paths as pdf_files, for duplicate checks
+        self._pdf_file_dialog = None  # Built on first "PDFを追加"
         self.review_result = None
         self.worker = None
         self.api_key = ""
         self.current_prompt_path = None  # Will auto-select first available prompt
+        self._prompts_mtime_ns = -1  # prompts directory mtime the combo was built from
+        self._prompt_paths = {}  # Prompt name -> file path from the last directory scan
+
+        # Model selection is written to config.ini once the combo settles
+        self._pending_model = None
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(500)
+        self._save_timer.timeout.connect(self._flush_model_to_config)
+        # Don't lose a selection made just before the app closes
+        QApplication.instance().aboutToQuit.connect(self._flush_model_to_config)
 
         self.init_ui()
         self.load_api_key()
@@ -907,10 +1329,7 @@ class Step2Page(QWidget):
 
         # Title
         title = QLabel("第2段階: AI評審")
-        title_font = QFont()
-        title_font.setPointSize(14)
-        title_font.setBold(True)
-        title.setFont(title_font)
+        title.setFont(title_font())
         layout.addWidget(title)
 
         # API Key configuration section
@@ -919,7 +1338,7 @@ class Step2Page(QWidget):
 
         # API Key status label
         self.api_key_status = QLabel("未設定")
-        self.api_key_status.setStyleSheet("color: gray;")
+        self.api_key_status.setStyleSheet(_IDLE_STYLE)
         api_layout.addWidget(self.api_key_status)
 
         # API Key manage button
@@ -991,10 +1410,13 @@ class Step2Page(QWidget):
 
         layout.addLayout(pdf_label_layout)
 
-        # Use DragDropListWidget for drag & drop support (PDF and MD files)
-        self.pdf_list = DragDropListWidget(parent=self, file_filter=[".pdf", ".md"])
+        # Use DragDropListView for drag & drop support (PDF and MD files)
+        self.pdf_model = PdfFileListModel(self.pdf_files, self)
+        self.pdf_list = DragDropListView(parent=self, file_filter=[".pdf", ".md"])
+        self.pdf_list.setModel(self.pdf_model)
         self.pdf_list.setMaximumHeight(120)
-        self.pdf_list.setSelectionMode(QListWidget.SingleSelection)
+        self.pdf_list.setUniformItemSizes(True)  # One line of text per row
+        self.pdf_list.setSelectionMode(QListView.SingleSelection)
         layout.addWidget(self.pdf_list)
 
         # Start review button
@@ -1034,15 +1456,16 @@ class Step2Page(QWidget):
     def load_api_key(self):
         """Load API key and model selection from config file"""
         try:
-            config = ConfigManager.load_config()
-            api_key = config['API']['gemini_api_key']
+            settings = ConfigManager.load_settings()
+            api_key = settings.gemini_api_key
             if api_key and api_key != "YOUR_API_KEY_HERE":
                 self.api_key = api_key
                 self.update_api_key_status()
 
-            # Load model selection
-            model = config['API'].get('gemini_model', 'gemini-2.5-pro')
-            self.model_combo.setCurrentText(model)
+            # Load model selection; this is the saved value, so don't schedule a write
+            with QSignalBlocker(self.model_combo):
+                self.model_combo.setCurrentText(settings.gemini_model)
+            self.model_description.setText(self._MODEL_DESCRIPTIONS.get(self.model_combo.currentText(), ""))
         except Exception as e:
             logger.warning(f"Could not load API key from config: {e}")
             self.api_key = ""
@@ -1054,10 +1477,10 @@ class Step2Page(QWidget):
             # Show masked key
             masked = self.api_key[:8] + "..." + self.api_key[-4:] if len(self.api_key) > 12 else "••••••"
             self.api_key_status.setText(f"設定済み ({masked})")
-            self.api_key_status.setStyleSheet("color: green; font-weight: bold;")
+            self.api_key_status.setStyleSheet(_OK_STYLE)
         else:
             self.api_key_status.setText("未設定")
-            self.api_key_status.setStyleSheet("color: gray;")
+            self.api_key_status.setStyleSheet(_IDLE_STYLE)
 
     def manage_api_key(self):
         """Open API key management dialog"""
@@ -1073,26 +1496,14 @@ class Step2Page(QWidget):
                 # Save to config
                 try:
                     # Try to load existing config, or create default if doesn't exist
-                    try:
-                        config = ConfigManager.load_config()
-                    except FileNotFoundError:
-                        # Create default config structure
+                    config, existed = ConfigManager.load_or_default()
+                    if not existed:
                         logger.info("Creating new config.ini file")
-                        config = {
-                            'API': {
-                                'gemini_api_key': '',
-                                'gemini_model': 'gemini-2.5-pro'
-                            },
-                            'Paths': {'default_output_dir': './output'},
-                            'Settings': {
-                                'temperature': '0',
-                                'max_output_tokens': '8192',
-                                'max_retries': '3'
-                            }
-                        }
-
-                    config['API']['gemini_api_key'] = new_key
-                    ConfigManager.save_config(config)
+
+                    # Only rewrite the file when the key actually changed
+                    if config['API']['gemini_api_key'] != new_key:
+                        config['API']['gemini_api_key'] = new_key
+                        ConfigManager.save_config(config)
                     QMessageBox.information(self, "保存完了", "API Keyを保存しました")
                 except Exception as e:
                     logger.error(f"Could not save API key: {e}")
@@ -1107,33 +1518,29 @@ class Step2Page(QWidget):
     def on_model_changed(self, model_name):
         """Handle model selection change"""
         # Update description based on model
-        descriptions = {
-            "gemini-2.5-pro": "最高品質（処理時間: 長い、503エラーの可能性: 高い）",
-            "gemini-2.0-flash-exp": "高速・実験版（処理時間: 短い、503エラーの可能性: 低い）",
-            "gemini-1.5-pro": "バランス型（処理時間: 中、503エラーの可能性: 中）",
-            "gemini-1.5-flash": "最速（処理時間: 最短、503エラーの可能性: 最低）"
-        }
-        self.model_description.setText(descriptions.get(model_name, ""))
-
-        # Save to config
+        self.model_description.setText(self._MODEL_DESCRIPTIONS.get(model_name, ""))
+
+        # Save to config after rapid changes have settled
+        self._pending_model = model_name
+        self._save_timer.start()
+
+    def _flush_model_to_config(self):
+        """Write the pending model selection to config.ini"""
+        self._save_timer.stop()
+        model_name = self._pending_model
+        self._pending_model = None
+        if model_name is None:
+            return
+
         try:
-            try:
-                config = ConfigManager.load_config()
-            except FileNotFoundError:
-                # Create default config structure
+            config, existed = ConfigManager.load_or_default()
+            if not existed:
                 logger.info("Creating new config.ini file")
-                config = {
-                    'API': {
-                        'gemini_api_key': self.api_key or '',
-                        'gemini_model': 'gemini-2.5-pro'
-                    },
-                    'Paths': {'default_output_dir': './output'},
-                    'Settings': {
-                        'temperature': '0',
-                        'max_output_tokens': '8192',
-                        'max_retries': '3'
-                    }
-                }
+                config['API']['gemini_api_key'] = self.api_key or ''
+
+            # Selecting the already saved model (e.g. from load_api_key) writes nothing
+            if config['API']['gemini_model'] == model_name:
+                return
 
             config['API']['gemini_model'] = model_name
             ConfigManager.save_config(config)
@@ -1143,90 +1550,92 @@ class Step2Page(QWidget):
 
     def set_pdf_files(self, pdf_files):
         """Receive PDF file list from Step 1"""
-        self.pdf_files = pdf_files
-        self.update_pdf_list()
+        # Copied into our list; Step 1 keeps (and may clear) its own
+        self.pdf_model.set_files(pdf_files)
+        self._pdf_set = set(self.pdf_files)
 
     def add_pdf_files(self):
         """Add PDF or Markdown files manually"""
-        file_paths, _ = QFileDialog.getOpenFileNames(
-            self,
-            "PDFまたはMarkdownファイルを選択",
-            "./output/pdfs",
-            "Supported Files (*.pdf *.md);;PDF Files (*.pdf);;Markdown Files (*.md);;All Files (*.*)"
-        )
+        # One dialog per page; it also remembers the last folder used
+        if self._pdf_file_dialog is None:
+            self._pdf_file_dialog = QFileDialog(self, "PDFまたはMarkdownファイルを選択", "./output/pdfs")
+            self._pdf_file_dialog.setFileMode(QFileDialog.ExistingFiles)
+            self._pdf_file_dialog.setNameFilters([
+                "Supported Files (*.pdf *.md)",
+                "PDF Files (*.pdf)",
+                "Markdown Files (*.md)",
+                "All Files (*.*)"
+            ])
+        if self._pdf_file_dialog.exec() != QDialog.Accepted:
+            return
+        file_paths = self._pdf_file_dialog.selectedFiles()
         if file_paths:
             # Add to existing list (avoid duplicates)
-            added_count = 0
-            for path in file_paths:
-                if path not in self.pdf_files:
-                    self.pdf_files.append(path)
-                    added_count += 1
-
-            self.update_pdf_list()
+            added_count = self._append_new_files(file_paths)
             logger.info(f"Added {added_count} files manually")
 
     def add_dropped_files(self, file_paths):
         """Handle files dropped on PDF list"""
-        added_count = 0
-        for path in file_paths:
-            if path not in self.pdf_files:
-                self.pdf_files.append(path)
-                added_count += 1
-
+        added_count = self._append_new_files(file_paths)
         if added_count > 0:
-            self.update_pdf_list()
             logger.info(f"Added {added_count} PDF files via drag & drop")
 
     def clear_pdf_files(self):
         """Clear all PDF files"""
-        reply = QMessageBox.question(
-            self,
-            "確認",
-            "すべてのPDFファイルをクリアしますか？",
-            QMessageBox.Yes | QMessageBox.No
-        )
+        reply = confirm(self, "確認", "すべてのPDFファイルをクリアしますか？")
 
-        if reply == QMessageBox.Yes:
-            self.pdf_files.clear()
-            self.update_pdf_list()
+        if reply:
+            self.pdf_model.set_files([])
+            self._pdf_set.clear()
             logger.info("Cleared all PDF files")
 
-    def update_pdf_list(self):
-        """Update PDF list display"""
-        self.pdf_list.clear()
-        if self.pdf_files:
-            for pdf_path in self.pdf_files:
-                item = QListWidgetItem(Path(pdf_path).name)
-                item.setToolTip(pdf_path)  # Show full path on hover
-                self.pdf_list.addItem(item)
-        else:
-            item = QListWidgetItem("（PDFファイルがありません）")
-            item.setFlags(item.flags() & ~Qt.ItemIsSelectable)  # Make it non-selectable
-            self.pdf_list.addItem(item)
+    def _append_new_files(self, file_paths):
+        """
+        Append paths not already listed, in one model insert
+
+        Returns:
+            int: Number of paths added
+        """
+        new_files = []
+        for path in file_paths:
+            if path not in self._pdf_set:
+                self._pdf_set.add(path)
+                new_files.append(path)
+        self.pdf_model.append_files(new_files)
+        return len(new_files)
 
     def delete_selected_pdf(self):
         """Delete selected PDF from list"""
-        current_row = self.pdf_list.currentRow()
+        current_row = self.pdf_list.currentIndex().row()
         if current_row >= 0 and current_row < len(self.pdf_files):
-            removed_file = self.pdf_files.pop(current_row)
-            self.update_pdf_list()
-            logger.info(f"Removed PDF file: {Path(removed_file).name}")
+            removed_file = self.pdf_model.remove_row(current_row)
+            self._pdf_set.discard(removed_file)
+            logger.info(f"Removed PDF file: {os.path.basename(removed_file)}")
         else:
             QMessageBox.information(self, "情報", "削除するPDFファイルを選択してください")
 
     def load_prompts(self):
         """Load available prompts into combo box"""
-        prompts_dir = Path("./prompts")
+        prompts_dir = PROMPTS_DIR
         prompts_dir.mkdir(exist_ok=True)
 
+        # Nothing added, removed or renamed since the combo was built
+        dir_mtime = os.stat(prompts_dir).st_mtime_ns
+        if dir_mtime == self._prompts_mtime_ns:
+            return
+
         # Save current selection
         current_text = self.prompt_combo.currentText()
 
+        # Rebuild without on_prompt_changed firing for every intermediate item;
+        # the final path is applied by update_current_prompt_path below
+        blocker = QSignalBlocker(self.prompt_combo)
+
         # Clear and reload
         self.prompt_combo.clear()
 
-        # Get all prompt files
-        prompt_files = sorted(prompts_dir.glob("*.txt"))
+        # Get all prompt names (scandir entries, already sorted)
+        prompt_files = scan_prompt_files(prompts_dir)
 
         if not prompt_files:
             # Create default if none exists
@@ -1236,11 +1645,14 @@ class Step2Page(QWidget):
             default_file = prompts_dir / "標準テンプレート.txt"
             with open(default_file, 'w', encoding='utf-8') as f:
                 f.write(default_prompt)
-            prompt_files = [default_file]
+            prompt_files = [(default_file.stem, str(default_file))]
+            dir_mtime = os.stat(prompts_dir).st_mtime_ns
+
+        self._prompts_mtime_ns = dir_mtime
+        self._prompt_paths = dict(prompt_files)
 
         # Add to combo box
-        for prompt_file in prompt_files:
-            self.prompt_combo.addItem(prompt_file.stem)
+        self.prompt_combo.addItems([name for name, _ in prompt_files])
 
         # Restore selection or select first
         if current_text:
@@ -1251,6 +1663,7 @@ class Step2Page(QWidget):
                 self.prompt_combo.setCurrentIndex(0)
         else:
             self.prompt_combo.setCurrentIndex(0)
+        blocker.unblock()
 
         # Update current path
         self.update_current_prompt_path()
@@ -1258,23 +1671,21 @@ class Step2Page(QWidget):
     def on_prompt_changed(self, prompt_name):
         """Handle prompt selection change"""
         if prompt_name:
-            prompts_dir = Path("./prompts")
-            prompt_file = prompts_dir / f"{prompt_name}.txt"
+            prompt_path = self._prompt_paths.get(prompt_name)
 
-            if prompt_file.exists():
-                self.current_prompt_path = str(prompt_file)
+            if prompt_path is not None:
+                self.current_prompt_path = prompt_path
                 logger.info(f"Prompt changed to: {prompt_name}")
             else:
-                logger.warning(f"Prompt file not found: {prompt_file}")
+                logger.warning(f"Prompt file not found: {prompt_name}.txt")
 
     def update_current_prompt_path(self):
         """Update current prompt path from combo box selection"""
         prompt_name = self.prompt_combo.currentText()
         if prompt_name:
-            prompts_dir = Path("./prompts")
-            prompt_file = prompts_dir / f"{prompt_name}.txt"
-            if prompt_file.exists():
-                self.current_prompt_path = str(prompt_file)
+            prompt_path = self._prompt_paths.get(prompt_name)
+            if prompt_path is not None:
+                self.current_prompt_path = prompt_path
 
     def manage_prompts(self):
         """Open prompt template manager"""
@@ -1306,16 +1717,10 @@ class Step2Page(QWidget):
             # Get selected model from UI
             model = self.model_combo.currentText()
 
-            # Load prompt from current selection
+            # A prompt must be selected; it is read by the worker
             if not self.current_prompt_path:
                 raise FileNotFoundError("プロンプトが選択されていません\n\n使用プロンプトを選択してください")
 
-            if not Path(self.current_prompt_path).exists():
-                raise FileNotFoundError(f"プロンプトファイルが見つかりません:\n{self.current_prompt_path}")
-
-            with open(self.current_prompt_path, 'r', encoding='utf-8') as f:
-                prompt = f.read()
-
             prompt_name = self.prompt_combo.currentText()
             logger.info(f"Using prompt: {prompt_name}")
 
@@ -1325,12 +1730,21 @@ class Step2Page(QWidget):
             self.progress.setRange(0, 0)  # Indeterminate mode
             self.status_label.setText("AI評審を実行中...")
 
-            # Create worker thread
-            self.worker = AIReviewWorker(self.pdf_files, prompt, self.api_key, model)
-            self.worker.finished.connect(self.on_review_finished)
-            self.worker.error.connect(self.on_review_error)
-            self.worker.progress.connect(self.on_review_progress)
-            self.worker.start()
+            # Debug files are only written when enabled in config.ini
+            try:
+                debug = ConfigManager.get(
+                    'Settings', 'debug', default=False,
+                    conv=lambda value: value.strip().lower() in ('1', 'true', 'yes', 'on')
+                )
+            except FileNotFoundError:
+                debug = False
+
+            # Run on the shared thread pool
+            self.worker = AIReviewWorker(list(self.pdf_files), self.current_prompt_path, self.api_key, model, debug)
+            self.worker.signals.finished.connect(self.on_review_finished)
+            self.worker.signals.error.connect(self.on_review_error)
+            self.worker.signals.progress.connect(self.on_review_progress)
+            self.controller.thread_pool.start(self.worker)
 
         except Exception as e:
             self.reset_ui()
@@ -1346,18 +1760,21 @@ class Step2Page(QWidget):
         self.review_result = result
 
         # Display result preview
-        preview = f"[完了] 評審完了\n\n抽出された行数: {len(result.rows)}\n\n"
-        preview += "最初の3行のプレビュー:\n" + "="*50 + "\n\n"
-
-        for i, row in enumerate(result.rows[:3], 1):
-            preview += f"【{i}】 {row.requirement_no}\n"
-            preview += f"  要求内容: {row.requirement_content[:50]}...\n"
-            preview += f"  評価: {row.evaluation}\n"
-            preview += f"  対応有無: {row.response_status}\n\n"
+        parts = [
+            f"[完了] 評審完了\n\n抽出された行数: {len(result.rows)}\n\n",
+            "最初の3行のプレビュー:\n" + "="*50 + "\n\n"
+        ]
+        parts.extend(
+            f"【{i}】 {row.requirement_no}\n"
+            f"  要求内容: {row.requirement_content[:50]}...\n"
+            f"  評価: {row.evaluation}\n"
+            f"  対応有無: {row.response_status}\n\n"
+            for i, row in enumerate(result.rows[:3], 1)
+        )
 
-        self.result_preview.setText(preview)
+        self.result_preview.setText("".join(parts))
         self.status_label.setText("[完了] AI評審が完了しました")
-        self.status_label.setStyleSheet("color: green; font-weight: bold;")
+        self.status_label.setStyleSheet(_OK_STYLE)
 
         # Pass to Step 3
         self.controller.step3_page.set_review_result(result)
@@ -1372,7 +1789,7 @@ class Step2Page(QWidget):
         """Handle review error"""
         self.reset_ui()
         self.status_label.setText("[失敗] AI評審が失敗しました")
-        self.status_label.setStyleSheet("color: red; font-weight: bold;")
+        self.status_label.setStyleSheet(_ERR_STYLE)
         QMessageBox.critical(self, "エラー", f"AI評審失敗:\n\n{error_msg}")
 
     def reset_ui(self):
@@ -1406,10 +1823,7 @@ class Step3Page(QWidget):
 
         # Title
         title = QLabel("第3段階: 結果保存")
-        title_font = QFont()
-        title_font.setPointSize(14)
-        title_font.setBold(True)
-        title.setFont(title_font)
+        title.setFont(title_font())
         layout.addWidget(title)
 
         # Form
@@ -1454,7 +1868,7 @@ class Step3Page(QWidget):
 
         restart_btn = QPushButton("最初に戻る")
         restart_btn.clicked.connect(self.restart_from_step1)
-        restart_btn.setStyleSheet("color: blue;")
+        restart_btn.setStyleSheet(_RESTART_BUTTON_STYLE)
         nav_layout.addWidget(restart_btn)
 
         layout.addLayout(nav_layout)
@@ -1478,14 +1892,9 @@ class Step3Page(QWidget):
 
     def restart_from_step1(self):
         """Go back to Step 1"""
-        reply = QMessageBox.question(
-            self,
-            "確認",
-            "最初のステップに戻りますか？\n\n現在の作業状態は保持されます。",
-            QMessageBox.Yes | QMessageBox.No
-        )
+        reply = confirm(self, "確認", "最初のステップに戻りますか？\n\n現在の作業状態は保持されます。")
 
-        if reply == QMessageBox.Yes:
+        if reply:
             self.controller.go_to_step(0)  # Go to Step 1 (index 0)
 
     def browse_directory(self):
@@ -1525,14 +1934,21 @@ class Step3Page(QWidget):
         version_number = int(version_text)
 
         try:
+            writer = ConfigManager.get('Settings', 'excel_writer', default='openpyxl')
+        except FileNotFoundError:
+            writer = 'openpyxl'
+
+        try:
+            import step3_save_results as step3
             output_path = step3.save_to_excel(
                 self.review_result,
                 version_number,
-                self.dir_label.text()
+                self.dir_label.text(),
+                writer
             )
 
             self.status_label.setText(f"[成功] 保存成功: {Path(output_path).name}")
-            self.status_label.setStyleSheet("color: green; font-weight: bold;")
+            self.status_label.setStyleSheet(_OK_STYLE)
 
             logger.info(f"Excel saved to: {output_path}")
 
@@ -1545,9 +1961,6 @@ class Step3Page(QWidget):
 
     def open_excel_file(self, file_path):
         """Open Excel file in default application"""
-        import os
-        import subprocess
-
         try:
             # Use os.startfile on Windows to open with default application
             if sys.platform == "win32":
@@ -1582,26 +1995,53 @@ class ReviAIApp(QMainWindow):
         # Store version number from Step1
         self.version_number = None
 
+        # Shared pool for background tasks (sheet loading, PDF export, AI review)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(min(QThread.idealThreadCount(), 4))
+
         # Create stacked widget for pages
         self.stack = QStackedWidget()
         self.setCentralWidget(self.stack)
 
-        # Create pages
-        self.step1_page = Step1Page(self)
-        self.step2_page = Step2Page(self)
-        self.step3_page = Step3Page(self)
+        # Create Step 1 now; Step 2/3 are built on first use behind placeholders
+        self._page_classes = [Step1Page, Step2Page, Step3Page]
+        self._pages = [Step1Page(self), None, None]
 
         # Add pages to stack
-        self.stack.addWidget(self.step1_page)
-        self.stack.addWidget(self.step2_page)
-        self.stack.addWidget(self.step3_page)
+        self.stack.addWidget(self._pages[0])
+        self.stack.addWidget(QWidget())
+        self.stack.addWidget(QWidget())
 
         logger.info("ReviAI application started")
 
+    def _page(self, index):
+        """Return the page at index, constructing it in place of its placeholder"""
+        page = self._pages[index]
+        if page is None:
+            page = self._pages[index] = self._page_classes[index](self)
+            placeholder = self.stack.widget(index)
+            self.stack.insertWidget(index, page)
+            self.stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+        return page
+
+    @property
+    def step1_page(self):
+        return self._pages[0]
+
+    @property
+    def step2_page(self):
+        return self._page(1)
+
+    @property
+    def step3_page(self):
+        return self._page(2)
+
     def next_step(self):
         """Go to next step"""
         current = self.stack.currentIndex()
         if current < self.stack.count() - 1:
+            self._page(current + 1)
             self.stack.setCurrentIndex(current + 1)
             logger.info(f"Navigated to step {current + 2}")
 
@@ -1619,6 +2059,7 @@ class ReviAIApp(QMainWindow):
     def go_to_step(self, step_index):
         """Go to specific step"""
         if 0 <= step_index < self.stack.count():
+            self._page(step_index)
             self.stack.setCurrentIndex(step_index)
             logger.info(f"Navigated to step {step_index + 1}")
 
@@ -1,11 +1,13 @@
 """
 Pydantic models for AI review results
 """
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class ReviewRow(BaseModel):
     """AI評審結果の1行を表すモデル"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     requirement_no: str = Field(
         description="要求No（例: REQ-001）"
     )
@@ -34,6 +36,8 @@ class ReviewRow(BaseModel):
 
 class ReviewTable(BaseModel):
     """AI評審結果の表全体"""
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     rows: list[ReviewRow] = Field(
         description=(
             "評審結果のすべての行。**絶対に1行も省略してはいけない。**"
@@ -1,18 +1,86 @@
 """
 Step 1: Excel to PDF conversion module
 """
+import os
 import xlwings as xw
 from pathlib import Path
-from typing import List
-from logger import logger
+from typing import AbstractSet, Dict, List, Tuple, Union
+from logger import init_child_logging, logger
 
 
-def list_all_sheets(excel_path: str) -> List[str]:
+# Sheet names per workbook, keyed on (path, st_size, st_mtime_ns)
+_SHEETS_CACHE: Dict[Tuple[str, int, int], List[str]] = {}
+
+
+class ExcelSession:
+    """
+    Hidden Excel instance with one workbook open
+
+    Use as a context manager and pass the session to list_all_sheets() /
+    generate_pdfs() so both run against one Excel start-up:
+
+        with ExcelSession(path) as session:
+            sheets = list_all_sheets(session)
+            generate_pdfs(session, sheets, 6, "./output/pdfs")
+
+    The workbook is opened read-only (PDF export never saves it), which
+    also lets several sessions open the same file at once. Alerts, screen
+    updating, recalculation and events are switched off for the session,
+    since each PageSetup write would otherwise trigger repaint/recalc
+    work in Excel; the previous calculation/event settings are restored
+    before Excel quits.
+    """
+
+    def __init__(self, excel_path: str):
+        self.excel_path = excel_path
+        self.app = None
+        self.wb = None
+        self._saved_state = None  # (Calculation, EnableEvents) before the session
+
+    def __enter__(self) -> "ExcelSession":
+        if not os.path.isfile(self.excel_path):
+            raise FileNotFoundError(f"Excel file not found: {self.excel_path}")
+
+        logger.info(f"Opening Excel file: {self.excel_path}")
+        self.app = xw.App(visible=False, add_book=False)
+        try:
+            self.app.display_alerts = False
+            self.app.screen_updating = False
+            self.wb = self.app.books.open(self.excel_path, read_only=True)
+
+            # Calculation can only be changed while a workbook is open
+            api = self.app.api
+            self._saved_state = (api.Calculation, api.EnableEvents)
+            api.Calculation = xw.constants.Calculation.xlCalculationManual
+            api.EnableEvents = False
+        except Exception:
+            self.app.quit()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            if self._saved_state is not None:
+                api = self.app.api
+                api.Calculation, api.EnableEvents = self._saved_state
+            if self.wb is not None:
+                self.wb.close()
+        finally:
+            self._saved_state = None
+            self.app.quit()
+            self.wb = None
+            self.app = None
+
+
+def list_all_sheets(excel: Union[str, ExcelSession]) -> List[str]:
     """
     List all sheet names in an Excel file
 
     Args:
-        excel_path: Path to Excel file
+        excel: Path to Excel file, or an open ExcelSession
+
+    For a path, results are cached until the file's size or mtime changes,
+    so re-selecting the same workbook doesn't start Excel again.
 
     Returns:
         List of sheet names
@@ -21,133 +89,452 @@ def list_all_sheets(excel_path: str) -> List[str]:
         FileNotFoundError: If Excel file doesn't exist
         Exception: If Excel operation fails
     """
-    excel_file = Path(excel_path)
-    if not excel_file.exists():
+    if isinstance(excel, ExcelSession):
+        return [sheet.name for sheet in excel.wb.sheets]
+
+    excel_path = excel
+    try:
+        st = os.stat(excel_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"Excel file not found: {excel_path}")
 
-    logger.info(f"Opening Excel file: {excel_path}")
+    cache_key = (excel_path, st.st_size, st.st_mtime_ns)
+    cached = _SHEETS_CACHE.get(cache_key)
+    if cached is not None:
+        logger.info(f"Using cached sheet list for: {excel_path}")
+        return list(cached)
 
-    app = xw.App(visible=False)
     try:
-        wb = xw.Book(excel_path)
-        sheet_names = [sheet.name for sheet in wb.sheets]
+        with ExcelSession(excel_path) as session:
+            sheet_names = [sheet.name for sheet in session.wb.sheets]
         logger.info(f"Found {len(sheet_names)} sheets: {sheet_names}")
-        wb.close()
-        return sheet_names
+        _SHEETS_CACHE[cache_key] = sheet_names
+        return list(sheet_names)
     except Exception as e:
         logger.error(f"Failed to list sheets: {str(e)}")
         raise
+
+
+def prepare_pdf_output(excel_path: str, output_dir: str) -> Path:
+    """
+    Check the Excel file and create the PDF output directory
+
+    Args:
+        excel_path: Path to Excel file
+        output_dir: Output directory for PDF files
+
+    Returns:
+        Path: Output directory
+
+    Raises:
+        FileNotFoundError: If Excel file doesn't exist
+    """
+    if not os.path.isfile(excel_path):
+        raise FileNotFoundError(f"Excel file not found: {excel_path}")
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+    return output_path
+
+
+# Supported generate_pdfs() backends
+PDF_BACKENDS = ("excel", "spire")
+
+# Worksheet.ExportAsFixedFormat arguments (XlFixedFormatType / XlFixedFormatQuality)
+_XL_TYPE_PDF = 0
+_XL_QUALITY_STANDARD = 0
+
+# PageSetup margins (Application.InchesToPoints is a fixed 72 pt/inch)
+_PAGE_MARGIN_INCHES = 0.25
+_HEADER_FOOTER_MARGIN_INCHES = 0.2
+_POINTS_PER_INCH = 72
+_PAGE_MARGIN = _PAGE_MARGIN_INCHES * _POINTS_PER_INCH
+_HEADER_FOOTER_MARGIN = _HEADER_FOOTER_MARGIN_INCHES * _POINTS_PER_INCH
+
+# Queue render_sheet_pdfs() reports finished sheets on, set in pool
+# processes by init_render_process()
+_progress_queue = None
+
+
+def _pdf_path(output_path: Path, base_name: str, sheet_name: str, version: int) -> Path:
+    """Get the PDF file generated for a sheet"""
+    return output_path / f"{base_name}_{sheet_name}_V{version}.pdf"
+
+
+def up_to_date_pdfs(
+    excel_path: str,
+    sheet_names: List[str],
+    version: int,
+    output_path: Path,
+    force: bool = False
+) -> Dict[str, str]:
+    """
+    Find sheets whose PDF already exists and is at least as new as the workbook
+
+    Args:
+        excel_path: Path to Excel file
+        sheet_names: Sheet names to check
+        version: Version number
+        output_path: Output directory for PDF files
+        force: Treat every PDF as outdated (returns an empty dict)
+
+    Returns:
+        Dict mapping each up-to-date sheet name to its PDF path
+    """
+    if force:
+        return {}
+    source_mtime = os.stat(excel_path).st_mtime_ns
+    base_name = Path(excel_path).stem
+    current = {}
+    for sheet_name in sheet_names:
+        pdf_path = _pdf_path(output_path, base_name, sheet_name, version)
+        try:
+            if os.stat(pdf_path).st_mtime_ns >= source_mtime:
+                current[sheet_name] = str(pdf_path)
+        except FileNotFoundError:
+            pass
+    return current
+
+
+def _check_sheets_exist(sheet_names: List[str], available_sheets: AbstractSet[str]) -> None:
+    """
+    Check that every requested sheet is in the workbook
+
+    Raises:
+        ValueError: Listing all missing sheet names
+    """
+    missing = [sheet_name for sheet_name in sheet_names if sheet_name not in available_sheets]
+    if len(missing) == 1:
+        raise ValueError(f"Sheet '{missing[0]}' not found in Excel file")
+    if missing:
+        raise ValueError(f"Sheets not found in Excel file: {', '.join(missing)}")
+
+
+def _export_sheet(ws, output_path: Path, base_name: str, sheet_name: str, version: int) -> str:
+    """Apply the PDF page setup to a sheet and export it"""
+    # Configure page setup for PDF
+    sheet_api = ws.api
+    ps = sheet_api.PageSetup
+
+    # Queue the PageSetup writes and send them to the printer driver at once
+    excel_app = sheet_api.Application
+    excel_app.PrintCommunication = False
+    try:
+        # Set page orientation to landscape
+        ps.Orientation = xw.constants.PageOrientation.xlLandscape
+
+        # Force all columns to fit in 1 page width
+        ps.Zoom = False  # Disable zoom, use FitToPages instead
+        ps.FitToPagesWide = 1      # All columns must fit in 1 page width
+        ps.FitToPagesTall = False  # False = unlimited pages for height (rows can span multiple pages)
+
+        # Set smaller margins to maximize content area
+        ps.LeftMargin = _PAGE_MARGIN
+        ps.RightMargin = _PAGE_MARGIN
+        ps.TopMargin = _PAGE_MARGIN
+        ps.BottomMargin = _PAGE_MARGIN
+        ps.HeaderMargin = _HEADER_FOOTER_MARGIN
+        ps.FooterMargin = _HEADER_FOOTER_MARGIN
     finally:
-        app.quit()
+        excel_app.PrintCommunication = True
 
+    # Generate PDF filename
+    pdf_path = _pdf_path(output_path, base_name, sheet_name, version)
 
-def generate_pdfs(
+    # Export to PDF directly; Sheet.to_pdf() goes through Book.to_pdf(),
+    # which hides and re-shows every other sheet around each export
+    logger.info(f"Exporting to: {pdf_path}")
+    sheet_api.ExportAsFixedFormat(
+        Type=_XL_TYPE_PDF,
+        Filename=str(pdf_path.resolve()),
+        Quality=_XL_QUALITY_STANDARD,
+        IncludeDocProperties=False,
+        IgnorePrintAreas=False,
+        OpenAfterPublish=False
+    )
+
+    logger.info(f"Successfully generated: {pdf_path.name}")
+    return str(pdf_path)
+
+
+def init_render_process(progress_queue, log_queue=None) -> None:
+    """
+    Process pool initializer for render_sheet_pdfs() tasks
+
+    Each sheet a task exports (or fails to export) is then reported by
+    putting its name on progress_queue, so the parent can show progress
+    per sheet rather than per group.
+
+    Args:
+        progress_queue: multiprocessing.Queue shared with the parent
+        log_queue: Queue from logger.forward_child_logs() in the parent;
+            log records are sent there instead of written to logs/app.log
+    """
+    global _progress_queue
+    _progress_queue = progress_queue
+    if log_queue is not None:
+        init_child_logging(log_queue)
+
+
+def render_sheet_pdfs(
     excel_path: str,
     sheet_names: List[str],
     version: int,
-    output_dir: str
-) -> List[str]:
+    output_dir: str,
+    force: bool = False
+) -> Dict[str, str]:
     """
-    Generate PDF files from Excel sheets
+    Export a group of sheets to PDF in their own Excel instance
+
+    Intended to run in a worker process, one group of sheets per task, so
+    several Excel instances export side by side while each one is started
+    only once for its group. The workbook is opened read-only so
+    concurrent instances don't contend for it; prepare_pdf_output()
+    must have been called first. Excel isn't started at all when every
+    sheet's PDF is already up to date.
 
     Args:
         excel_path: Path to Excel file
-        sheet_names: List of sheet names to export
+        sheet_names: Sheet names to export in this instance
         version: Version number
         output_dir: Output directory for PDF files
+        force: Re-export sheets whose PDF is already newer than the workbook
 
     Returns:
-        List of generated PDF file paths
+        Dict mapping each exported (or already up-to-date) sheet name to its PDF path
 
     Raises:
         FileNotFoundError: If Excel file doesn't exist
-        ValueError: If sheet name doesn't exist
-        Exception: If PDF generation fails
+        Exception: If Excel can't be started or the workbook can't be opened
     """
-    excel_file = Path(excel_path)
-    if not excel_file.exists():
-        raise FileNotFoundError(f"Excel file not found: {excel_path}")
-
-    # Create output directory
     output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+    base_name = Path(excel_path).stem  # Filename without extension
+    generated_files = up_to_date_pdfs(excel_path, sheet_names, version, output_path, force)
+    for pdf_path in generated_files.values():
+        logger.info(f"Skipping up-to-date PDF: {Path(pdf_path).name}")
+    pending = [sheet_name for sheet_name in sheet_names if sheet_name not in generated_files]
+    if not pending:
+        return generated_files
 
-    logger.info(f"Starting PDF generation for {len(sheet_names)} sheets")
+    with ExcelSession(excel_path) as session:
+        available_sheets = set(list_all_sheets(session))
+        for sheet_name in pending:
+            logger.info(f"Processing sheet: {sheet_name}")
+            try:
+                if sheet_name not in available_sheets:
+                    raise ValueError(f"Sheet '{sheet_name}' not found in Excel file")
+                generated_files[sheet_name] = _export_sheet(
+                    session.wb.sheets[sheet_name], output_path, base_name, sheet_name, version
+                )
+            except Exception as e:
+                logger.error(f"Failed to generate PDF for sheet '{sheet_name}': {str(e)}")
+                # Continue with other sheets instead of stopping
+            if _progress_queue is not None:
+                _progress_queue.put(sheet_name)
 
-    app = xw.App(visible=False)
-    generated_files = []
+    return generated_files
+
+
+def _generate_pdfs_spire(
+    excel_path: str,
+    sheet_names: List[str],
+    version: int,
+    output_dir: str,
+    force: bool = False
+) -> List[str]:
+    """Export sheets to PDF in-process with Spire.XLS (no Excel/COM needed)"""
+    try:
+        from spire.xls import PageOrientationType, Workbook
+    except ImportError:
+        raise ImportError("The 'spire' PDF backend requires Spire.XLS (pip install Spire.XLS)")
+
+    output_path = prepare_pdf_output(excel_path, output_dir)
+    base_name = Path(excel_path).stem  # Filename without extension
 
+    logger.info(f"Starting PDF generation for {len(sheet_names)} sheets (Spire.XLS)")
+
+    current = up_to_date_pdfs(excel_path, sheet_names, version, output_path, force)
+    if all(sheet_name in current for sheet_name in sheet_names):
+        logger.info(f"All {len(sheet_names)} PDFs are up to date; skipping export")
+        return [current[sheet_name] for sheet_name in sheet_names]
+
+    generated_files = []
+    workbook = Workbook()
     try:
-        wb = xw.Book(excel_path)
-        base_name = excel_file.stem  # Filename without extension
+        workbook.LoadFromFile(excel_path)
+        worksheets = workbook.Worksheets
+        sheets = {worksheets[i].Name: worksheets[i] for i in range(worksheets.Count)}
 
         # Verify all sheet names exist
-        available_sheets = [sheet.name for sheet in wb.sheets]
-        for sheet_name in sheet_names:
-            if sheet_name not in available_sheets:
-                raise ValueError(f"Sheet '{sheet_name}' not found in Excel file")
+        _check_sheets_exist(sheet_names, sheets.keys())
 
-        # Generate PDF for each sheet
         for sheet_name in sheet_names:
+            if sheet_name in current:
+                logger.info(f"Skipping up-to-date PDF: {Path(current[sheet_name]).name}")
+                generated_files.append(current[sheet_name])
+                continue
             try:
                 logger.info(f"Processing sheet: {sheet_name}")
-                ws = wb.sheets[sheet_name]
 
-                # Configure page setup for PDF
-                ps = ws.api.PageSetup
+                # Same page setup as the Excel backend (Spire margins are in inches)
+                ps = sheets[sheet_name].PageSetup
+                ps.Orientation = PageOrientationType.Landscape
+                ps.FitToPagesWide = 1
+                ps.FitToPagesTall = 0  # 0 = unlimited pages for height
+                ps.LeftMargin = _PAGE_MARGIN_INCHES
+                ps.RightMargin = _PAGE_MARGIN_INCHES
+                ps.TopMargin = _PAGE_MARGIN_INCHES
+                ps.BottomMargin = _PAGE_MARGIN_INCHES
+                ps.HeaderMarginInch = _HEADER_FOOTER_MARGIN_INCHES
+                ps.FooterMarginInch = _HEADER_FOOTER_MARGIN_INCHES
+
+                pdf_path = _pdf_path(output_path, base_name, sheet_name, version)
+                logger.info(f"Exporting to: {pdf_path}")
+                sheets[sheet_name].SaveToPdf(str(pdf_path))
 
-                # Set page orientation to landscape
-                ps.Orientation = xw.constants.PageOrientation.xlLandscape
+                logger.info(f"Successfully generated: {pdf_path.name}")
+                generated_files.append(str(pdf_path))
+            except Exception as e:
+                logger.error(f"Failed to generate PDF for sheet '{sheet_name}': {str(e)}")
+                # Continue with other sheets instead of stopping
+                continue
 
-                # Force all columns to fit in 1 page width
-                ps.Zoom = False  # Disable zoom, use FitToPages instead
-                ps.FitToPagesWide = 1      # All columns must fit in 1 page width
-                ps.FitToPagesTall = False  # False = unlimited pages for height (rows can span multiple pages)
+        logger.info(f"PDF generation complete. Generated {len(generated_files)}/{len(sheet_names)} files")
+        return generated_files
 
-                # Set smaller margins to maximize content area
-                ps.LeftMargin = ws.api.Application.InchesToPoints(0.25)
-                ps.RightMargin = ws.api.Application.InchesToPoints(0.25)
-                ps.TopMargin = ws.api.Application.InchesToPoints(0.25)
-                ps.BottomMargin = ws.api.Application.InchesToPoints(0.25)
-                ps.HeaderMargin = ws.api.Application.InchesToPoints(0.2)
-                ps.FooterMargin = ws.api.Application.InchesToPoints(0.2)
+    except Exception as e:
+        logger.error(f"PDF generation failed: {str(e)}")
+        raise
+    finally:
+        workbook.Dispose()
 
-                # Generate PDF filename
-                pdf_name = f"{base_name}_{sheet_name}_V{version}.pdf"
-                pdf_path = output_path / pdf_name
 
-                # Export to PDF
-                logger.info(f"Exporting to: {pdf_path}")
-                ws.to_pdf(str(pdf_path))
+def generate_pdfs(
+    excel: Union[str, ExcelSession],
+    sheet_names: List[str],
+    version: int,
+    output_dir: str,
+    backend: str = "excel",
+    force: bool = False
+) -> List[str]:
+    """
+    Generate PDF files from Excel sheets
 
-                generated_files.append(str(pdf_path))
-                logger.info(f"Successfully generated: {pdf_name}")
+    With the "excel" backend, sheets are exported one after another in a
+    single Excel instance; see render_sheet_pdfs() for exporting sheets in
+    parallel. The "spire" backend loads the workbook once with Spire.XLS
+    and exports every sheet in-process, without Excel or COM.
+
+    Sheets whose PDF already exists and is at least as new as the workbook
+    are not exported again unless force is set; Excel (or Spire.XLS) isn't
+    started when all of them are up to date.
+
+    Args:
+        excel: Path to Excel file, or an open ExcelSession to reuse
+            ("excel" backend only)
+        sheet_names: List of sheet names to export
+        version: Version number
+        output_dir: Output directory for PDF files
+        backend: One of PDF_BACKENDS
+        force: Re-export sheets whose PDF is already up to date
+
+    Returns:
+        List of generated PDF file paths
+
+    Raises:
+        FileNotFoundError: If Excel file doesn't exist
+        ValueError: If sheet name or backend doesn't exist
+        ImportError: If the "spire" backend is selected but Spire.XLS isn't installed
+        Exception: If PDF generation fails
+    """
+    if backend not in PDF_BACKENDS:
+        raise ValueError(f"Unknown PDF backend: {backend}")
+    if backend == "spire":
+        if isinstance(excel, ExcelSession):
+            raise ValueError("The 'spire' backend takes an Excel file path, not an ExcelSession")
+        return _generate_pdfs_spire(excel, sheet_names, version, output_dir, force)
+
+    excel_path = excel.excel_path if isinstance(excel, ExcelSession) else excel
+    output_path = prepare_pdf_output(excel_path, output_dir)
+    # Checked once; the same result decides what the session exports
+    current = up_to_date_pdfs(excel_path, sheet_names, version, output_path, force)
+
+    if isinstance(excel, ExcelSession):
+        return _generate_pdfs_session(excel, sheet_names, version, output_path, current)
+
+    if all(sheet_name in current for sheet_name in sheet_names):
+        logger.info(f"All {len(sheet_names)} PDFs are up to date; skipping export")
+        return [current[sheet_name] for sheet_name in sheet_names]
+    with ExcelSession(excel) as session:
+        return _generate_pdfs_session(session, sheet_names, version, output_path, current)
+
+
+def _generate_pdfs_session(
+    session: ExcelSession,
+    sheet_names: List[str],
+    version: int,
+    output_path: Path,
+    current: Dict[str, str]
+) -> List[str]:
+    """
+    Export sheets in an open session, reusing the PDFs listed in current
+
+    Args:
+        session: Open ExcelSession
+        sheet_names: List of sheet names to export
+        version: Version number
+        output_path: Directory returned by prepare_pdf_output()
+        current: Up-to-date PDFs from up_to_date_pdfs() (empty when forced)
+
+    Returns:
+        List of generated PDF file paths
+    """
+    logger.info(f"Starting PDF generation for {len(sheet_names)} sheets")
+
+    generated_files = []
+
+    try:
+        wb = session.wb
+        base_name = Path(session.excel_path).stem  # Filename without extension
+
+        # Verify all sheet names exist
+        _check_sheets_exist(sheet_names, set(list_all_sheets(session)))
+
+        # Generate PDF for each sheet
+        for sheet_name in sheet_names:
+            if sheet_name in current:
+                logger.info(f"Skipping up-to-date PDF: {Path(current[sheet_name]).name}")
+                generated_files.append(current[sheet_name])
+                continue
+            try:
+                logger.info(f"Processing sheet: {sheet_name}")
+                generated_files.append(
+                    _export_sheet(wb.sheets[sheet_name], output_path, base_name, sheet_name, version)
+                )
 
             except Exception as e:
                 logger.error(f"Failed to generate PDF for sheet '{sheet_name}': {str(e)}")
                 # Continue with other sheets instead of stopping
                 continue
 
-        wb.close()
-
         logger.info(f"PDF generation complete. Generated {len(generated_files)}/{len(sheet_names)} files")
         return generated_files
 
     except Exception as e:
         logger.error(f"PDF generation failed: {str(e)}")
         raise
-    finally:
-        app.quit()
 
 
 if __name__ == "__main__":
     # Test code
     test_excel = "プログラム基本設計書_累積作成ツール.xlsx"
     if Path(test_excel).exists():
-        sheets = list_all_sheets(test_excel)
-        print(f"Available sheets: {sheets}")
-
-        # Test PDF generation with first sheet
-        if sheets:
-            pdfs = generate_pdfs(test_excel, [sheets[0]], 6, "./output/pdfs")
-            print(f"Generated PDFs: {pdfs}")
+        # One Excel instance for both listing and export
+        with ExcelSession(test_excel) as session:
+            sheets = list_all_sheets(session)
+            print(f"Available sheets: {sheets}")
+
+            # Test PDF generation with first sheet
+            if sheets:
+                pdfs = generate_pdfs(session, [sheets[0]], 6, "./output/pdfs")
+                print(f"Generated PDFs: {pdfs}")
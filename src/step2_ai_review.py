@@ -8,23 +8,226 @@ warnings.filterwarnings("ignore", message="Couldn't find ffmpeg or avconv")
 warnings.filterwarnings("ignore", category=UserWarning, module="onnxruntime")
 warnings.filterwarnings("ignore", category=RuntimeWarning, module="pydub")
 
-from google import genai
-from google.genai import types
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple, Union
 from models import ReviewTable
-from logger import logger
-from markitdown import MarkItDown
+from logger import forward_child_logs, init_child_logging, logger
+import atexit
+import hashlib
+import io
 import json
-from datetime import datetime
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+# google.genai and markitdown pull in large dependency trees; they are
+# imported on first use so loading this module stays cheap
+if TYPE_CHECKING:
+    from google import genai
+
+
+# Gemini context caches: key -> {name, model, expire_time (epoch seconds)};
+# prompts too small to cache are kept as {name: None, model, tokens, expire_time}
+GEMINI_CACHE_INDEX = Path("./output/gemini_cache_index.json")
+_CACHE_TTL_SECONDS = 3600
+_CACHE_EXPIRY_MARGIN = 120
+# Minimum cached token count (gemini-2.5-pro; other models accept less)
+_MIN_CACHE_TOKENS = 4096
+# Used when count_tokens fails: ~4 characters per token for English text
+_CHARS_PER_TOKEN = 4
+# Too-small results depend only on the content, so they're remembered longer
+_SMALL_PROMPT_TTL_SECONDS = 30 * 24 * 3600
+_CACHED_REVIEW_INSTRUCTION = "キャッシュ済みのドキュメントをシステム指示に従って評審し、結果を出力してください。"
+
+# Retry backoff: random wait in [0, min(max, base * 2**attempt)] seconds
+_BASE_BACKOFF_SECONDS = 3
+_MAX_BACKOFF_SECONDS = 60
+# Client errors worth retrying: request timeout and rate limiting
+_RETRYABLE_CLIENT_CODES = (408, 429)
+
+# Rule above and below each document header in the combined Markdown
+_SECTION_RULE = "=" * 80
+
+# "V6"/"v6"/"_6" (and 7) anywhere in a filename, in one scan
+_VERSION_RE = re.compile(r'[vV_]([67])')
+# Checked in this order
+_VERSION_MARKERS = {"6": " (前回の設計書 V6)", "7": " (今回の設計書 V7)"}
+
+# Debug files are written in the background, in order, off the request path
+_debug_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="debug-writer")
+atexit.register(_debug_writer.shutdown, wait=True)
+
+# One MarkItDown converter per conversion thread (and process)
+_converter_local = threading.local()
+
+# Converted Markdown per PDF, named <sha256>_<size>.md after the PDF bytes
+MD_CACHE_DIR = Path("./output/md_cache")
+_HASH_CHUNK_SIZE = 1024 * 1024
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _md_cache_path(file_path: str) -> Path:
+    """Get the Markdown cache file for a PDF from a streaming sha256 of its content"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+            size += len(chunk)
+    return MD_CACHE_DIR / f"{digest.hexdigest()}_{size}.md"
+
+
+def _write_atomic(path: Path, content: Union[str, Sequence[str]]) -> None:
+    """
+    Write a text file via a temp file + rename so readers never see a partial file
+
+    Args:
+        path: Destination file path
+        content: Text, or text parts written one after another without
+            joining them first
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+    # Large buffer so a multi-MB prompt or cache entry goes out in few writes
+    with open(tmp_path, 'w', encoding='utf-8', newline='', buffering=_WRITE_BUFFER_SIZE) as f:
+        f.writelines((content,) if isinstance(content, str) else content)
+    os.replace(tmp_path, path)
+
+
+def _convert_pdf(file_path: str, cache_path: Path) -> str:
+    """
+    Convert a PDF to Markdown and store the result in the Markdown cache
+
+    Runs in a conversion worker process (or inline for a single PDF), so
+    each process builds its own MarkItDown converter.
+
+    Args:
+        file_path: PDF file path
+        cache_path: Cache file from _md_cache_path()
+
+    Returns:
+        str: Markdown content of the file
+    """
+    filename = Path(file_path).name
+    md_converter = getattr(_converter_local, 'converter', None)
+    if md_converter is None:
+        from markitdown import MarkItDown
+        md_converter = _converter_local.converter = MarkItDown()
+    result = md_converter.convert(file_path)
+    markdown_content = result.text_content
+    logger.info(f"Converted PDF to Markdown: {filename}")
+
+    try:
+        _write_atomic(cache_path, markdown_content)
+    except OSError as e:
+        logger.warning(f"Could not cache Markdown for {filename}: {e}")
+    return markdown_content
+
+
+def _read_local(file_path: str) -> Tuple[Optional[str], Optional[Path]]:
+    """
+    Read a Markdown file, or a PDF's earlier conversion from the cache
+
+    PDF conversions are cached in MD_CACHE_DIR by content hash, so an
+    unchanged PDF is only parsed once across retries and runs.
+
+    Args:
+        file_path: PDF or Markdown file path
+
+    Returns:
+        Tuple of (Markdown content, None) if available without converting,
+        otherwise (None, cache file to convert into)
+    """
+    filename = Path(file_path).name
+    logger.info(f"Processing file: {filename}")
+
+    # Check if it's a Markdown file
+    if Path(file_path).suffix.lower() == '.md':
+        # Read Markdown file directly
+        markdown_content = Path(file_path).read_text(encoding='utf-8')
+        logger.info(f"Read Markdown file: {filename}")
+        return markdown_content, None
+
+    # Reuse an earlier conversion of the same PDF content
+    cache_path = _md_cache_path(file_path)
+    try:
+        with open(cache_path, 'r', encoding='utf-8', newline='') as f:
+            markdown_content = f.read()
+    except FileNotFoundError:
+        return None, cache_path
+    logger.info(f"Using cached Markdown for: {filename}")
+    return markdown_content, None
+
+
+def _file_error(file_path: str, e: Exception) -> Exception:
+    """Log a per-file failure and build the error raised for it"""
+    logger.error(f"Failed to process {file_path}: {str(e)}")
+    return Exception(f"File processing failed for {Path(file_path).name}: {str(e)}")
+
+
+def _convert_pending(pending: List[Tuple[int, str, Path]], max_workers: int) -> Dict[int, str]:
+    """
+    Convert the PDFs missing from the Markdown cache
+
+    Several PDFs are converted in separate processes, since PDF text
+    extraction is CPU-bound; a single PDF is converted inline to avoid
+    the process start-up cost.
 
+    Args:
+        pending: (index, file path, cache file) for each PDF to convert
+        max_workers: Maximum number of conversion processes
 
-def convert_files_to_markdown(file_paths: List[str]) -> str:
+    Returns:
+        Dict mapping each index to its Markdown content
+    """
+    if len(pending) == 1 or max_workers == 1:
+        converted = {}
+        for idx, file_path, cache_path in pending:
+            try:
+                converted[idx] = _convert_pdf(file_path, cache_path)
+            except Exception as e:
+                raise _file_error(file_path, e)
+        return converted
+
+    workers = min(max_workers, len(pending))
+    # Workers log through the parent so only one process writes app.log
+    with forward_child_logs() as log_queue, ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_child_logging,
+        initargs=(log_queue,)
+    ) as executor:
+        futures = {
+            executor.submit(_convert_pdf, file_path, cache_path): (idx, file_path)
+            for idx, file_path, cache_path in pending
+        }
+        converted = {}
+        for future in as_completed(futures):
+            idx, file_path = futures[future]
+            try:
+                converted[idx] = future.result()
+            except Exception as e:
+                for other in futures:
+                    other.cancel()
+                raise _file_error(file_path, e)
+    return converted
+
+
+def convert_files_to_markdown(file_paths: List[str], max_workers: Optional[int] = None) -> str:
     """
     Convert multiple PDF or Markdown files to combined Markdown format
 
+    PDFs not found in the Markdown cache are converted concurrently in
+    worker processes; the combined output keeps the order of file_paths.
+
     Args:
         file_paths: List of PDF or Markdown file paths
+        max_workers: Maximum number of files converted at the same time
+            (default: CPU count)
 
     Returns:
         str: Combined Markdown content from all files
@@ -33,76 +236,400 @@ def convert_files_to_markdown(file_paths: List[str]) -> str:
         FileNotFoundError: If any file doesn't exist
         Exception: If conversion fails
     """
-    md_converter = MarkItDown()
-    combined_markdown = []
-
-    for idx, file_path in enumerate(file_paths, 1):
+    for file_path in file_paths:
         if not Path(file_path).exists():
             raise FileNotFoundError(f"File not found: {file_path}")
 
+    # Markdown files and cached PDFs are read here; the rest need converting
+    contents: Dict[int, str] = {}
+    pending: List[Tuple[int, str, Path]] = []
+    for idx, file_path in enumerate(file_paths):
+        try:
+            markdown_content, cache_path = _read_local(file_path)
+        except Exception as e:
+            raise _file_error(file_path, e)
+        if markdown_content is None:
+            pending.append((idx, file_path, cache_path))
+        else:
+            contents[idx] = markdown_content
+
+    if pending:
+        contents.update(_convert_pending(pending, max(1, max_workers or os.cpu_count() or 1)))
+
+    # Sections are written straight into one buffer instead of building
+    # each one as a string and joining them afterwards
+    buf = io.StringIO()
+    for idx, file_path in enumerate(file_paths):
         filename = Path(file_path).name
         file_ext = Path(file_path).suffix.lower()
 
-        logger.info(f"Processing file: {filename}")
+        # Detect version from filename (V6, V7, etc.); V6 wins if both appear
+        versions = set(_VERSION_RE.findall(filename))
+        version = next((v for v in _VERSION_MARKERS if v in versions), None)
+        version_marker = _VERSION_MARKERS[version] if version else f" (Document {idx + 1})"
+
+        # Separate documents with a blank line
+        if idx:
+            buf.write("\n\n")
+
+        # Create clear document boundary with version info
+        buf.write(
+            f"\n{_SECTION_RULE}\n"
+            f"ドキュメント: {Path(file_path).stem}{file_ext}{version_marker}\n"
+            f"ファイル名: {filename}\n"
+            f"{_SECTION_RULE}\n\n"
+        )
+        buf.write(contents.pop(idx))
+        buf.write("\n")
+        logger.info(f"Successfully processed: {filename}{version_marker}")
 
-        try:
-            # Check if it's a Markdown file
-            if file_ext == '.md':
-                # Read Markdown file directly
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    markdown_content = f.read()
-                logger.info(f"Read Markdown file: {filename}")
-            else:
-                # Convert PDF to Markdown
-                result = md_converter.convert(file_path)
-                markdown_content = result.text_content
-                logger.info(f"Converted PDF to Markdown: {filename}")
-
-            # Detect version from filename (V6, V7, etc.)
-            version_marker = ""
-            if "V6" in filename.upper() or "_6" in filename:
-                version_marker = " (前回の設計書 V6)"
-            elif "V7" in filename.upper() or "_7" in filename:
-                version_marker = " (今回の設計書 V7)"
-            else:
-                version_marker = f" (Document {idx})"
+    full_markdown = buf.getvalue()
+    logger.info(f"Combined {len(file_paths)} files into Markdown ({len(full_markdown)} characters)")
 
-            # Create clear document boundary with version info
-            file_section = f"""
-{'='*80}
-ドキュメント: {Path(file_path).stem}{file_ext}{version_marker}
-ファイル名: {filename}
-{'='*80}
+    return full_markdown
 
-{markdown_content}
-"""
-            combined_markdown.append(file_section)
-            logger.info(f"Successfully processed: {filename}{version_marker}")
 
-        except Exception as e:
-            logger.error(f"Failed to process {file_path}: {str(e)}")
-            raise Exception(f"File processing failed for {filename}: {str(e)}")
+# Legacy name kept for backward compatibility
+convert_pdfs_to_markdown = convert_files_to_markdown
 
-    # Combine all markdown content with clear separators
-    full_markdown = "\n\n".join(combined_markdown)
-    logger.info(f"Combined {len(file_paths)} files into Markdown ({len(full_markdown)} characters)")
 
-    return full_markdown
+def _write_debug_file(path: Path, content: Union[str, Sequence[str]], description: str) -> None:
+    """Write one debug file on the debug writer thread"""
+    try:
+        _write_atomic(path, content)
+        logger.info(f"Saved {description} to: {path}")
+    except OSError as e:
+        logger.warning(f"Could not save {description}: {e}")
+
+
+def _write_parsed_result(path: Path, result: ReviewTable) -> None:
+    """Serialize and write the parsed result on the debug writer thread"""
+    # pydantic-core serializes straight to JSON (UTF-8, unescaped) in one pass
+    _write_debug_file(path, result.model_dump_json(indent=2), "parsed result")
+
+
+@dataclass(frozen=True)
+class _PreparedPrompt:
+    """
+    Review request built once per review and reused by every API attempt
+
+    The prompt is kept as text parts (template, separator, documents) that
+    are sent and written as they are, so the multi-MB Markdown is never
+    copied into one concatenated prompt string.
+    """
+    debug: bool
+    prompt_template: str
+    # "# PDF Content" header, combined Markdown, trailing newline
+    document_parts: Tuple[str, ...]
+    debug_dir: Path
+    timestamp: str
+    # (path, content, description) of debug files not written yet
+    debug_files: List[Tuple[Path, Union[str, Sequence[str]], str]]
+
+    @property
+    def prompt_parts(self) -> Tuple[str, ...]:
+        """Full prompt as parts: template followed by the documents"""
+        return (self.prompt_template, "\n\n") + self.document_parts
+
+
+def _validate_review_args(pdf_paths: List[str], api_key: str) -> None:
+    """
+    Check the API key and input files before any work is done
+
+    Raises:
+        ValueError: If API key is invalid
+        FileNotFoundError: If file doesn't exist
+    """
+    if not api_key or api_key == "YOUR_API_KEY_HERE" or api_key == "YOUR_GEMINI_API_KEY_HERE":
+        raise ValueError("Invalid API key. Please configure your Gemini API key in config.ini")
+
+    for file_path in pdf_paths:
+        if not Path(file_path).exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+
+def _prepare_prompt(pdf_paths: List[str], prompt_template: str, debug: bool = False) -> _PreparedPrompt:
+    """
+    Convert the review files to Markdown and build the full prompt
+
+    Args:
+        pdf_paths: List of PDF or Markdown file paths to review
+        prompt_template: Prompt template content
+        debug: Save debug files for this review
+
+    Returns:
+        _PreparedPrompt: Full prompt plus the debug files to save with it
+    """
+    # Convert files to Markdown
+    logger.info("Processing files to Markdown format...")
+    markdown_content = convert_files_to_markdown(pdf_paths)
+    logger.info(f"File processing completed. Total content length: {len(markdown_content)} characters")
+
+    # Debug directory is created by the first debug write
+    debug_dir = Path("./output/debug")
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    # Build request contents (prompt + markdown content) without joining them
+    prepared = _PreparedPrompt(
+        debug=debug,
+        prompt_template=prompt_template,
+        document_parts=("# PDF Content (Markdown format):\n\n", markdown_content, "\n"),
+        debug_dir=debug_dir,
+        timestamp=timestamp,
+        debug_files=[]
+    )
+    prepared.debug_files.extend([
+        (debug_dir / f"pdf_markdown_{timestamp}.md", markdown_content, "Markdown content"),
+        (debug_dir / f"full_prompt_{timestamp}.txt", prepared.prompt_parts, "full prompt"),
+    ])
+    return prepared
+
+
+def _load_cache_index() -> Dict[str, Dict[str, Any]]:
+    """Read the cache index, treating a missing or corrupt file as empty"""
+    try:
+        with open(GEMINI_CACHE_INDEX, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_cache_index(index: Dict[str, Dict[str, Any]]) -> None:
+    """Write the cache index, ignoring (but logging) disk errors"""
+    try:
+        _write_atomic(GEMINI_CACHE_INDEX, json.dumps(index, ensure_ascii=False, indent=2))
+    except OSError as e:
+        logger.warning(f"Could not save Gemini cache index: {e}")
+
+
+def _get_cached_content(client: "genai.Client", prepared: _PreparedPrompt, model: str) -> Optional[str]:
+    """
+    Get a Gemini context cache holding the prompt template and documents
+
+    An unexpired cache for the same model, template and documents is
+    reused from GEMINI_CACHE_INDEX; otherwise a new one is created with
+    the template as system instruction and the documents as contents.
+
+    Args:
+        client: Gemini client
+        prepared: Request built by _prepare_prompt()
+        model: Model name
+
+    Returns:
+        Cached content name, or None to send the full prompt instead
+        (content too small to cache or cache creation failed)
+    """
+    # A token is at least one character, so this can't reach the minimum
+    n_chars = len(prepared.prompt_template) + sum(map(len, prepared.document_parts))
+    if n_chars < _MIN_CACHE_TOKENS:
+        return None
+
+    digest = hashlib.sha256()
+    for part in (model, prepared.prompt_template):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    for part in prepared.document_parts:
+        digest.update(part.encode('utf-8'))
+    key = digest.hexdigest()
+
+    # Drop entries that expire before a review could finish with them
+    now = time.time()
+    index = {
+        k: entry for k, entry in _load_cache_index().items()
+        if entry.get('expire_time', 0) > now + _CACHE_EXPIRY_MARGIN
+    }
+    entry = index.get(key)
+    if entry is not None:
+        if entry.get('name') is None:
+            logger.debug(f"Prompt too small for a Gemini context cache ({entry.get('tokens')} tokens)")
+            return None
+        logger.info(f"Using Gemini context cache: {entry['name']}")
+        return entry['name']
+
+    # caches.create rejects content below the minimum; count it once and
+    # remember a too-small result under the same key
+    tokens = _count_prompt_tokens(client, prepared, model, n_chars)
+    if tokens < _MIN_CACHE_TOKENS:
+        index[key] = {
+            'name': None,
+            'model': model,
+            'tokens': tokens,
+            'expire_time': now + _SMALL_PROMPT_TTL_SECONDS
+        }
+        _save_cache_index(index)
+        logger.info(f"Prompt too small for a Gemini context cache ({tokens} tokens), sending full prompt")
+        return None
+
+    from google.genai import types
+
+    try:
+        cache = client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name=f"reviai_{key[:16]}",
+                system_instruction=prepared.prompt_template,
+                contents=list(prepared.document_parts),
+                ttl=f"{_CACHE_TTL_SECONDS}s"
+            )
+        )
+    except Exception as e:
+        logger.warning(f"Could not create Gemini context cache, sending full prompt: {e}")
+        return None
+
+    expire_time = cache.expire_time.timestamp() if cache.expire_time else now + _CACHE_TTL_SECONDS
+    index[key] = {'name': cache.name, 'model': model, 'expire_time': expire_time}
+    _save_cache_index(index)
+    logger.info(f"Created Gemini context cache: {cache.name}")
+    return cache.name
+
+
+def _count_prompt_tokens(client: "genai.Client", prepared: _PreparedPrompt, model: str, n_chars: int) -> int:
+    """
+    Count the tokens a context cache for the prepared prompt would hold
+
+    Falls back to an estimate of n_chars / _CHARS_PER_TOKEN if the count
+    request fails.
+    """
+    try:
+        response = client.models.count_tokens(
+            model=model,
+            contents=[prepared.prompt_template, *prepared.document_parts]
+        )
+        if response.total_tokens is not None:
+            return response.total_tokens
+    except Exception as e:
+        logger.warning(f"Could not count prompt tokens, estimating from length: {e}")
+    return n_chars // _CHARS_PER_TOKEN
+
+
+def _is_cache_error(e: Exception) -> bool:
+    """Tell whether a failed request was rejected because its context cache is invalid"""
+    from google.genai import errors
+
+    if not isinstance(e, errors.ClientError):
+        return False
+    if e.code in (403, 404):
+        return True
+    message = f"{e.message or ''} {e.status or ''}".lower()
+    return e.code == 400 and ('cache' in message or 'cached' in message)
+
+
+def _forget_cached_content(client: "genai.Client", cache_name: str) -> None:
+    """Delete a cache that failed to serve a request from the server and the index"""
+    try:
+        client.caches.delete(name=cache_name)
+        logger.info(f"Deleted Gemini context cache: {cache_name}")
+    except Exception as e:
+        # Already gone (expired or deleted) is the usual reason for the failure
+        logger.debug(f"Could not delete Gemini context cache {cache_name}: {e}")
+
+    index = _load_cache_index()
+    remaining = {k: entry for k, entry in index.items() if entry.get('name') != cache_name}
+    if len(remaining) != len(index):
+        _save_cache_index(remaining)
 
 
-def convert_pdfs_to_markdown(pdf_paths: List[str]) -> str:
+def _call_gemini(
+    client: "genai.Client",
+    prepared: _PreparedPrompt,
+    model: str,
+    write_prompt_files: bool = True,
+    cache_name: Optional[str] = None
+) -> ReviewTable:
     """
-    Legacy function for backward compatibility.
-    Redirects to convert_files_to_markdown.
+    Send a prepared review request to Gemini and parse the result
+
+    Args:
+        client: Gemini client
+        prepared: Request built by _prepare_prompt()
+        model: Model name
+        write_prompt_files: Save the Markdown/full prompt debug files (only
+            needed on the first attempt); ignored unless prepared.debug
+        cache_name: Context cache from _get_cached_content(); only a short
+            instruction is sent when given
+
+    Returns:
+        ReviewTable: Structured review results
+
+    Raises:
+        Exception: If the API call fails or returns no parsed result
     """
-    return convert_files_to_markdown(pdf_paths)
+    from google.genai import types
+
+    debug_dir = prepared.debug_dir
+    timestamp = prepared.timestamp
+
+    logger.info("Calling Gemini API for review...")
+
+    # The template goes in the system instruction and only the documents in
+    # the user message (a list of strings is sent as one message with several
+    # text parts); both are already on the server when a cache is used.
+    # Generate requests can't set a system instruction alongside a cache.
+    if cache_name:
+        contents = _CACHED_REVIEW_INSTRUCTION
+        system_instruction = None
+    else:
+        contents = list(prepared.document_parts)
+        system_instruction = prepared.prompt_template
+
+    # Markdown content and full prompt are saved while the request is in flight
+    if prepared.debug and write_prompt_files:
+        for path, content, description in prepared.debug_files:
+            _debug_writer.submit(_write_debug_file, path, content, description)
+
+    # Call Gemini API with JSON Schema
+    response = client.models.generate_content(
+        model=model,
+        contents=contents,
+        config=types.GenerateContentConfig(
+            response_mime_type='application/json',
+            response_schema=ReviewTable,
+            temperature=0,
+            max_output_tokens=65536,  # Increased from 8192 to support large tables
+            system_instruction=system_instruction,
+            cached_content=cache_name,
+        )
+    )
+
+    # Save raw API response (if available)
+    if prepared.debug:
+        try:
+            raw_response = (
+                f"Model: {model}\n"
+                f"Response text: {response.text if hasattr(response, 'text') else 'N/A'}\n"
+                f"Candidates: {len(response.candidates) if hasattr(response, 'candidates') else 0}\n"
+            )
+            if hasattr(response, 'usage_metadata'):
+                raw_response += f"Usage metadata: {response.usage_metadata}\n"
+            _debug_writer.submit(
+                _write_debug_file, debug_dir / f"api_response_raw_{timestamp}.txt", raw_response, "raw API response"
+            )
+        except Exception as e:
+            logger.warning(f"Could not save raw response: {e}")
+
+    # Get parsed structured data
+    result: ReviewTable = response.parsed
+
+    if result is None:
+        logger.error("Failed to parse API response")
+        raise Exception("Gemini API returned None for parsed result")
+
+    logger.info(f"AI review completed successfully. Extracted {len(result.rows)} rows")
+
+    # Save parsed result as JSON
+    if prepared.debug:
+        _debug_writer.submit(_write_parsed_result, debug_dir / f"parsed_result_{timestamp}.json", result)
+        logger.info(f"⚠️ DEBUG: Debug files are being saved to: {debug_dir}")
+
+    return result
 
 
 def review_with_gemini(
     pdf_paths: List[str],
     prompt_template: str,
     api_key: str,
-    model: str = "gemini-2.5-pro"
+    model: str = "gemini-2.5-pro",
+    debug: bool = False
 ) -> ReviewTable:
     """
     Perform AI review using Gemini Pro
@@ -112,6 +639,8 @@ def review_with_gemini(
         prompt_template: Prompt template content
         api_key: Gemini API key
         model: Model name (default: gemini-2.5-pro)
+        debug: Save the prompt, raw response and parsed result to
+            ./output/debug (written on a background thread)
 
     Returns:
         ReviewTable: Structured review results
@@ -121,100 +650,71 @@ def review_with_gemini(
         ValueError: If API key is invalid
         Exception: If API call fails
     """
-    # Validate API key
-    if not api_key or api_key == "YOUR_API_KEY_HERE" or api_key == "YOUR_GEMINI_API_KEY_HERE":
-        raise ValueError("Invalid API key. Please configure your Gemini API key in config.ini")
-
-    # Validate files exist
-    for file_path in pdf_paths:
-        if not Path(file_path).exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
+    _validate_review_args(pdf_paths, api_key)
 
     logger.info(f"Starting AI review with {len(pdf_paths)} files")
     logger.info(f"Using model: {model}")
 
     try:
-        # Convert files to Markdown
-        logger.info("Processing files to Markdown format...")
-        markdown_content = convert_files_to_markdown(pdf_paths)
-        logger.info(f"File processing completed. Total content length: {len(markdown_content)} characters")
-
-        # Create debug directory
-        debug_dir = Path("./output/debug")
-        debug_dir.mkdir(parents=True, exist_ok=True)
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-
-        # Save Markdown content
-        markdown_file = debug_dir / f"pdf_markdown_{timestamp}.md"
-        with open(markdown_file, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
-        logger.info(f"Saved Markdown content to: {markdown_file}")
+        prepared = _prepare_prompt(pdf_paths, prompt_template, debug)
 
         # Initialize Gemini client
+        from google import genai
         client = genai.Client(api_key=api_key)
+        cache_name = _get_cached_content(client, prepared, model)
 
-        # Build request contents (prompt + markdown content)
-        full_prompt = f"""{prompt_template}
-
-# PDF Content (Markdown format):
+        return _call_gemini(client, prepared, model, cache_name=cache_name)
 
-{markdown_content}
-"""
+    except Exception as e:
+        logger.error(f"AI review failed: {str(e)}")
+        raise
 
-        # Save full prompt
-        prompt_file = debug_dir / f"full_prompt_{timestamp}.txt"
-        with open(prompt_file, 'w', encoding='utf-8') as f:
-            f.write(full_prompt)
-        logger.info(f"Saved full prompt to: {prompt_file}")
 
-        logger.info("Calling Gemini API for review...")
+def _is_retryable(e: Exception) -> bool:
+    """Tell whether a failed attempt can succeed when repeated (not a 4xx request error)"""
+    from google.genai import errors
 
-        # Call Gemini API with JSON Schema
-        response = client.models.generate_content(
-            model=model,
-            contents=full_prompt,
-            config=types.GenerateContentConfig(
-                response_mime_type='application/json',
-                response_schema=ReviewTable,
-                temperature=0,
-                max_output_tokens=65536,  # Increased from 8192 to support large tables
-            )
-        )
-
-        # Save raw API response (if available)
-        try:
-            raw_response_file = debug_dir / f"api_response_raw_{timestamp}.txt"
-            with open(raw_response_file, 'w', encoding='utf-8') as f:
-                f.write(f"Model: {model}\n")
-                f.write(f"Response text: {response.text if hasattr(response, 'text') else 'N/A'}\n")
-                f.write(f"Candidates: {len(response.candidates) if hasattr(response, 'candidates') else 0}\n")
-                if hasattr(response, 'usage_metadata'):
-                    f.write(f"Usage metadata: {response.usage_metadata}\n")
-            logger.info(f"Saved raw API response to: {raw_response_file}")
-        except Exception as e:
-            logger.warning(f"Could not save raw response: {e}")
+    if isinstance(e, errors.ClientError):
+        return e.code in _RETRYABLE_CLIENT_CODES
+    return True
 
-        # Get parsed structured data
-        result: ReviewTable = response.parsed
 
-        if result is None:
-            logger.error("Failed to parse API response")
-            raise Exception("Gemini API returned None for parsed result")
+def _server_retry_delay(e: Exception) -> Optional[float]:
+    """
+    Get the retry delay requested by the server, if any
 
-        # Save parsed result as JSON
-        result_file = debug_dir / f"parsed_result_{timestamp}.json"
-        with open(result_file, 'w', encoding='utf-8') as f:
-            json.dump(result.model_dump(), f, ensure_ascii=False, indent=2)
-        logger.info(f"Saved parsed result to: {result_file}")
+    Gemini reports it for 429 errors as a google.rpc.RetryInfo entry
+    (e.g. "retryDelay": "31s") in the error details.
+    """
+    delay = getattr(e, 'retry_delay', None)
+    if delay is None:
+        details = getattr(e, 'details', None)
+        if not isinstance(details, dict):
+            return None
+        error = details.get('error', details)
+        for detail in error.get('details') or []:
+            if isinstance(detail, dict) and str(detail.get('@type', '')).endswith('RetryInfo'):
+                delay = detail.get('retryDelay')
+                break
+    if isinstance(delay, str):
+        delay = delay.strip().rstrip('s')
+    try:
+        return max(0.0, float(delay)) if delay is not None else None
+    except (TypeError, ValueError):
+        return None
 
-        logger.info(f"AI review completed successfully. Extracted {len(result.rows)} rows")
-        logger.info(f"⚠️ DEBUG: All debug files saved to: {debug_dir}")
 
-        return result
+def _retry_wait(e: Exception, attempt: int) -> float:
+    """
+    Seconds to wait before the next attempt: the server's delay, else full-jitter backoff
 
-    except Exception as e:
-        logger.error(f"AI review failed: {str(e)}")
-        raise
+    Never more than _MAX_BACKOFF_SECONDS; review_with_retry() gives up
+    instead of waiting out a longer server delay.
+    """
+    delay = _server_retry_delay(e)
+    if delay is not None:
+        return min(delay, _MAX_BACKOFF_SECONDS)
+    return random.uniform(0, min(_MAX_BACKOFF_SECONDS, _BASE_BACKOFF_SECONDS * (2 ** attempt)))
 
 
 def review_with_retry(
@@ -222,41 +722,90 @@ def review_with_retry(
     prompt_template: str,
     api_key: str,
     model: str = "gemini-2.5-pro",
-    max_retries: int = 3
+    max_retries: int = 3,
+    debug: bool = False
 ) -> ReviewTable:
     """
     Perform AI review with retry logic
 
+    Files are converted and the prompt is built once up front, and one
+    Gemini client and context cache are shared by all attempts (the cache
+    is dropped only if the server rejects it); only the API call is
+    retried. Waits between attempts use the server's retry delay when
+    given, else exponential backoff with full jitter; a server delay over
+    _MAX_BACKOFF_SECONDS fails right away instead. Request errors (4xx
+    other than 408/429) are not retried.
+
     Args:
         pdf_paths: List of PDF file paths
         prompt_template: Prompt template content
         api_key: Gemini API key
         model: Model name
         max_retries: Maximum number of retry attempts
+        debug: Save debug files (see review_with_gemini())
 
     Returns:
         ReviewTable: Structured review results
 
     Raises:
-        Exception: If all retry attempts fail
+        FileNotFoundError: If file doesn't exist
+        ValueError: If API key is invalid
+        Exception: If conversion or all retry attempts fail
     """
-    import time
+    _validate_review_args(pdf_paths, api_key)
+
+    logger.info(f"Starting AI review with {len(pdf_paths)} files")
+    logger.info(f"Using model: {model}")
+
+    try:
+        prepared = _prepare_prompt(pdf_paths, prompt_template, debug)
+    except Exception as e:
+        logger.error(f"AI review failed: {str(e)}")
+        raise
+
+    # Initialize Gemini client
+    from google import genai
+    client = genai.Client(api_key=api_key)
+    cache_name = _get_cached_content(client, prepared, model)
 
     last_exception = None
 
     for attempt in range(max_retries):
         try:
             logger.info(f"Attempt {attempt + 1}/{max_retries}")
-            result = review_with_gemini(pdf_paths, prompt_template, api_key, model)
+            result = _call_gemini(
+                client, prepared, model, write_prompt_files=attempt == 0, cache_name=cache_name
+            )
             return result
 
         except Exception as e:
             last_exception = e
             logger.warning(f"Attempt {attempt + 1} failed: {str(e)}")
 
+            if cache_name is not None and _is_cache_error(e):
+                # The cache expired or was deleted; resend the full prompt.
+                # Transient errors keep retrying with the same cache.
+                logger.warning(f"Gemini context cache rejected, sending full prompt: {cache_name}")
+                _forget_cached_content(client, cache_name)
+                cache_name = None
+            elif not _is_retryable(e):
+                logger.error(f"Not retrying after non-retryable error: {str(e)}")
+                raise
+
+            # A quota reset minutes or hours away would leave the worker
+            # sleeping with no way to cancel it; report when to retry instead
+            server_delay = _server_retry_delay(e)
+            if server_delay is not None and server_delay > _MAX_BACKOFF_SECONDS:
+                retry_at = datetime.now() + timedelta(seconds=server_delay)
+                logger.error(f"Not retrying: server asked to wait {server_delay:.0f} seconds")
+                raise Exception(
+                    f"Gemini API rate limit reached. Please retry after "
+                    f"{retry_at:%Y-%m-%d %H:%M:%S} ({server_delay:.0f} seconds): {str(e)}"
+                ) from e
+
             if attempt < max_retries - 1:
-                wait_time = 3 * (2 ** attempt)  # Exponential backoff: 3s, 6s, 12s
-                logger.info(f"Retrying in {wait_time} seconds...")
+                wait_time = _retry_wait(e, attempt)
+                logger.info(f"Retrying in {wait_time:.1f} seconds...")
                 time.sleep(wait_time)
             else:
                 logger.error(f"All {max_retries} attempts failed")
@@ -269,8 +818,7 @@ if __name__ == "__main__":
     from config_manager import ConfigManager
 
     # Load configuration
-    config = ConfigManager.load_config()
-    api_key = config['API']['gemini_api_key']
+    api_key = ConfigManager.load_settings().gemini_api_key
     prompt = ConfigManager.get_prompt_template()
 
     # Test with sample PDF (if exists)
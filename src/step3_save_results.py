@@ -1,18 +1,291 @@
 """
 Step 3: Save review results to Excel with formatting
 """
-from openpyxl import Workbook
+import functools
+import importlib.util
+import operator
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+from datetime import datetime, timezone
+from zipfile import ZIP_DEFLATED, ZipFile
+from openpyxl import LXML, Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import Cell
 from openpyxl.styles import PatternFill, Border, Side, Alignment, Font
+from openpyxl.utils import get_column_letter
+from openpyxl.writer.excel import ExcelWriter
 from pathlib import Path
+from typing import BinaryIO, List, Optional, Sequence, Tuple, Union
 from models import ReviewTable
 from logger import logger
 
 
+# openpyxl serializes sheet XML with lxml when it's installed, which is
+# much faster on save than the xml.etree fallback
+if not LXML:
+    logger.warning("lxml not installed; openpyxl save will be slower")
+
+# Supported save_to_excel() writers; "auto" picks one by table size
+EXCEL_WRITERS = ("openpyxl", "xlsxwriter", "auto")
+
+# Row count from which "auto" switches to XlsxWriter (when installed);
+# below it, writer setup costs more than the rows themselves
+_LARGE_TABLE_ROWS = 50
+
+# Column headers of the result sheet
+HEADERS = (
+    "要求No",
+    "要求内容 (ペルソナ: 指令)",
+    "評価 (〇/△/×)",
+    "適合/不適合箇所",
+    "適合/不適合理由",
+    "修正案 (ゴールデンケースを含む)",
+    "対応有無",
+    "対応方法／非対応理由"
+)
+
+SHEET_TITLE = "評審結果"
+
+# Japanese numerals for round numbers 1-10, indexed by the number itself
+_JP_NUMS = ("", "一", "二", "三", "四", "五", "六", "七", "八", "九", "十")
+
+# ReviewRow fields in HEADERS order; returns one tuple per row in a single call
+_ROW_GETTER = operator.attrgetter(
+    'requirement_no',
+    'requirement_content',
+    'evaluation',
+    'compliance_location',
+    'compliance_reason',
+    'correction_plan',
+    'response_status',
+    'response_method'
+)
+
+# openpyxl styles (immutable, so shared by every workbook)
+# Header row: Light blue background
+_HEADER_FILL = PatternFill(
+    start_color="ADD8E6",
+    end_color="ADD8E6",
+    fill_type="solid"
+)
+_HEADER_FONT = Font(bold=True)
+_HEADER_ALIGNMENT = Alignment(horizontal="center", vertical="center")
+# All cells: Borders
+_THIN_BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+_DATA_ALIGNMENT = Alignment(
+    horizontal="left",
+    vertical="top",
+    wrap_text=True
+)
+
+# Column width bounds; a line of _MAX_WIDTH - 2 characters already hits the cap
+_MIN_WIDTH = 10
+_MAX_WIDTH = 50
+
+# Deflate level for openpyxl saves: the sheets are small, so fast
+# compression matters more than a few percent of file size
+_ZIP_COMPRESSLEVEL = 1
+
+# Column letters A..P, looked up by 0-based column index
+_COL_LETTERS = [get_column_letter(i) for i in range(1, 17)]
+
+
+def _styled_cell(ws, value, style_cell: Cell) -> Cell:
+    """
+    Create a write-only cell with the same style as style_cell
+
+    Values are stored the same way as in _write_xlsxwriter(): non-empty
+    strings as text (openpyxl would otherwise write "=..." as a formula)
+    and empty strings as blank cells.
+
+    Copies the cell's private _style array (openpyxl internals, hence the
+    openpyxl<3.2 pin in requirements.txt).
+    """
+    cell = WriteOnlyCell(ws, value=value or None)
+    if cell.value is not None:
+        cell.data_type = 's'
+    cell._style = copy(style_cell._style)
+    return cell
+
+
+def _column_widths(headers: Sequence[str], data_rows: List[Tuple[str, ...]]) -> List[int]:
+    """
+    Compute auto-fit column widths from the longest line in each column
+
+    Returns:
+        Width per column (minimum 10, maximum 50)
+    """
+    # Longest line per column, collected in one pass over the rows
+    col_max = [len(header) for header in headers]
+    # ReviewRow fields are all validated str, so no conversion is needed
+    saturated = _MAX_WIDTH - 2
+    for values in data_rows:
+        for col_idx, cell_value in enumerate(values):
+            # Skip empty cells and columns already at the maximum width
+            if not cell_value or col_max[col_idx] >= saturated:
+                continue
+            # Consider line breaks (split only multi-line values)
+            if '\n' in cell_value:
+                longest = max(map(len, cell_value.split('\n')))
+            else:
+                longest = len(cell_value)
+            if longest > col_max[col_idx]:
+                col_max[col_idx] = longest
+
+    # Set column width (minimum 10, maximum 50)
+    return [min(max(max_length + 2, _MIN_WIDTH), _MAX_WIDTH) for max_length in col_max]
+
+
+@functools.lru_cache(maxsize=None)
+def _xlsxwriter_available() -> bool:
+    """Check once per process whether XlsxWriter can be imported"""
+    return importlib.util.find_spec("xlsxwriter") is not None
+
+
+def _auto_writer(n_rows: int) -> str:
+    """Pick the writer for an "auto" save based on the number of data rows"""
+    if n_rows >= _LARGE_TABLE_ROWS and _xlsxwriter_available():
+        return "xlsxwriter"
+    return "openpyxl"
+
+
+def _save_workbook(wb: Workbook, target: Union[Path, BinaryIO]) -> None:
+    """
+    Save wb like Workbook.save(), but deflate at _ZIP_COMPRESSLEVEL
+
+    Mirrors openpyxl.writer.excel.save_workbook, which always uses the
+    zlib default level. That function and ExcelWriter(wb, archive) are
+    openpyxl internals, not public API; keep this in step with them when
+    raising the openpyxl<3.2 pin in requirements.txt.
+    """
+    archive = ZipFile(target, 'w', ZIP_DEFLATED, allowZip64=True, compresslevel=_ZIP_COMPRESSLEVEL)
+    wb.properties.modified = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+    ExcelWriter(wb, archive).save()
+
+
+def _write_openpyxl(
+    output_file: Path,
+    data_rows: List[Tuple[str, ...]],
+    widths: List[int],
+    output_sink: Optional[BinaryIO] = None
+) -> None:
+    """Write the formatted result sheet with openpyxl in write-only mode"""
+    # Write-only mode streams rows straight to the sheet XML instead of
+    # keeping a Cell object per value in memory
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title=SHEET_TITLE)
+
+    # === Apply Formatting ===
+    # The module-level styles are attached to each cell as it is written;
+    # a write-only sheet can't be revisited after the rows are appended
+
+    # Sheet extent is known up front; a write-only sheet has no
+    # max_row/max_column (or dimensions) to scan
+    n_rows = len(data_rows) + 1
+    n_cols = len(HEADERS)
+
+    # AutoFilter
+    ws.auto_filter.ref = f"A1:{_COL_LETTERS[n_cols - 1]}{n_rows}"
+
+    # Column widths (written before the rows in write-only mode)
+    for col_idx, width in enumerate(widths):
+        ws.column_dimensions[_COL_LETTERS[col_idx]].width = width
+
+    # Row heights are left unset: Excel sizes wrapped rows automatically
+
+    # Register each style combination with the workbook once; cells then
+    # copy the resulting style ids instead of looking every style up again
+    header_style = WriteOnlyCell(ws)
+    header_style.fill = _HEADER_FILL
+    header_style.font = _HEADER_FONT
+    header_style.alignment = _HEADER_ALIGNMENT
+    header_style.border = _THIN_BORDER
+
+    data_style = WriteOnlyCell(ws)
+    data_style.border = _THIN_BORDER
+    data_style.alignment = _DATA_ALIGNMENT
+
+    # Write header row
+    ws.append([_styled_cell(ws, header, header_style) for header in HEADERS])
+
+    # Write data rows
+    for values in data_rows:
+        ws.append([_styled_cell(ws, value, data_style) for value in values])
+
+    logger.info("Data written to worksheet")
+
+    # Save workbook (zip entries are written to the stream incrementally)
+    if output_sink is not None:
+        _save_workbook(wb, output_sink)
+    else:
+        with open(output_file, 'wb') as f:
+            _save_workbook(wb, f)
+
+
+def _write_xlsxwriter(
+    output_file: Path,
+    data_rows: List[Tuple[str, ...]],
+    widths: List[int],
+    output_sink: Optional[BinaryIO] = None
+) -> None:
+    """Write the formatted result sheet with XlsxWriter (same layout as openpyxl)"""
+    try:
+        import xlsxwriter
+    except ImportError:
+        raise ImportError("The 'xlsxwriter' Excel writer requires XlsxWriter (pip install XlsxWriter)")
+
+    if output_sink is not None:
+        # A stream target needs in_memory (constant_memory uses temp files)
+        wb = xlsxwriter.Workbook(output_sink, {'in_memory': True})
+    else:
+        # constant_memory flushes each row to disk once the next one starts
+        wb = xlsxwriter.Workbook(str(output_file), {'constant_memory': True})
+    try:
+        ws = wb.add_worksheet(SHEET_TITLE)
+
+        # One format object per style, referenced by id from every cell
+        header_fmt = wb.add_format({
+            'bold': True, 'bg_color': '#ADD8E6', 'pattern': 1,
+            'align': 'center', 'valign': 'vcenter', 'border': 1
+        })
+        data_fmt = wb.add_format({
+            'align': 'left', 'valign': 'top', 'text_wrap': True, 'border': 1
+        })
+
+        for col_idx, width in enumerate(widths):
+            ws.set_column(col_idx, col_idx, width)
+        ws.autofilter(0, 0, len(data_rows), len(HEADERS) - 1)
+
+        # write_string keeps values as text ("=..." or URLs aren't converted);
+        # empty values are styled blank cells, matching the openpyxl writer
+        for col_idx, header in enumerate(HEADERS):
+            ws.write_string(0, col_idx, header, header_fmt)
+        for row_idx, values in enumerate(data_rows, 1):
+            for col_idx, value in enumerate(values):
+                if value:
+                    ws.write_string(row_idx, col_idx, value, data_fmt)
+                else:
+                    ws.write_blank(row_idx, col_idx, None, data_fmt)
+
+        logger.info("Data written to worksheet")
+    finally:
+        wb.close()
+
+
 def save_to_excel(
     review_table: ReviewTable,
     round_number: int,
-    output_dir: str
-) -> str:
+    output_dir: str,
+    writer: str = "openpyxl",
+    output_sink: Optional[BinaryIO] = None
+) -> Union[str, BinaryIO]:
     """
     Save review results to formatted Excel file
 
@@ -20,136 +293,58 @@ def save_to_excel(
         review_table: AI review results
         round_number: Round number (e.g., 6 for "第六回")
         output_dir: Output directory
+        writer: One of EXCEL_WRITERS; "xlsxwriter" writes the same layout
+            with XlsxWriter format objects (optional dependency), "auto"
+            uses XlsxWriter for large tables if it is installed
+        output_sink: Binary stream (e.g. io.BytesIO) to write the workbook
+            to instead of a file in output_dir
 
     Returns:
-        str: Path to generated Excel file
+        str: Path to generated Excel file, or output_sink if one was given
 
     Raises:
-        ValueError: If review_table is empty
+        ValueError: If review_table is empty or writer is unknown
+        ImportError: If "xlsxwriter" is selected but XlsxWriter isn't installed
         Exception: If Excel generation fails
     """
-    if not review_table.rows:
+    n_rows = len(review_table.rows)
+    if n_rows == 0:
         raise ValueError("Review table is empty. No data to save.")
+    if writer not in EXCEL_WRITERS:
+        raise ValueError(f"Unknown Excel writer: {writer}")
 
-    # Create output directory
+    # Create output directory (not needed when writing to a stream)
     output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+    if output_sink is None:
+        output_path.mkdir(parents=True, exist_ok=True)
 
     # Convert number to Japanese round format
-    japanese_numbers = {
-        1: "一", 2: "二", 3: "三", 4: "四", 5: "五",
-        6: "六", 7: "七", 8: "八", 9: "九", 10: "十"
-    }
-    round_name = japanese_numbers.get(round_number, str(round_number))
+    round_name = _JP_NUMS[round_number] if 1 <= round_number <= 10 else str(round_number)
     filename = f"第{round_name}回.xlsx"
     output_file = output_path / filename
 
     logger.info(f"Creating Excel file: {filename}")
-    logger.info(f"Processing {len(review_table.rows)} rows")
+    logger.info(f"Processing {n_rows} rows")
 
     try:
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "評審結果"
-
-        # Define column headers
-        headers = [
-            "要求No",
-            "要求内容 (ペルソナ: 指令)",
-            "評価 (〇/△/×)",
-            "適合/不適合箇所",
-            "適合/不適合理由",
-            "修正案 (ゴールデンケースを含む)",
-            "対応有無",
-            "対応方法／非対応理由"
-        ]
+        data_rows = [_ROW_GETTER(row) for row in review_table.rows]
 
-        # Write header row
-        ws.append(headers)
-
-        # Write data rows
-        for row in review_table.rows:
-            ws.append([
-                row.requirement_no,
-                row.requirement_content,
-                row.evaluation,
-                row.compliance_location,
-                row.compliance_reason,
-                row.correction_plan,
-                row.response_status,
-                row.response_method
-            ])
+        # Auto-adjust column widths
+        widths = _column_widths(HEADERS, data_rows)
 
-        logger.info("Data written to worksheet")
+        if writer == "auto":
+            writer = _auto_writer(n_rows)
+            logger.debug(f"Excel writer selected: {writer}")
 
-        # === Apply Formatting ===
-
-        # 1. Header row: Light blue background
-        header_fill = PatternFill(
-            start_color="ADD8E6",
-            end_color="ADD8E6",
-            fill_type="solid"
-        )
-        header_font = Font(bold=True)
-        header_alignment = Alignment(horizontal="center", vertical="center")
-
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = header_alignment
-
-        # 2. All cells: Borders
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
-        for row in ws.iter_rows(min_row=1, max_row=ws.max_row,
-                               min_col=1, max_col=ws.max_column):
-            for cell in row:
-                cell.border = thin_border
-                # Align data cells
-                if cell.row > 1:
-                    cell.alignment = Alignment(
-                        horizontal="left",
-                        vertical="top",
-                        wrap_text=True
-                    )
-
-        # 3. AutoFilter
-        ws.auto_filter.ref = ws.dimensions
-
-        # 4. Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-
-            for cell in column:
-                try:
-                    cell_value = str(cell.value) if cell.value else ""
-                    # Consider line breaks
-                    lines = cell_value.split('\n')
-                    max_line_length = max(len(line) for line in lines) if lines else 0
-                    if max_line_length > max_length:
-                        max_length = max_line_length
-                except:
-                    pass
-
-            # Set column width (minimum 10, maximum 50)
-            adjusted_width = min(max(max_length + 2, 10), 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # 5. Set row height for wrapped text
-        for row in range(2, ws.max_row + 1):
-            ws.row_dimensions[row].height = None  # Auto height
+        if writer == "xlsxwriter":
+            _write_xlsxwriter(output_file, data_rows, widths, output_sink)
+        else:
+            _write_openpyxl(output_file, data_rows, widths, output_sink)
 
         logger.info("Formatting applied")
-
-        # Save workbook
-        wb.save(output_file)
+        if output_sink is not None:
+            logger.info(f"Excel file written to stream: {filename}")
+            return output_sink
         logger.info(f"Excel file saved successfully: {output_file}")
 
         return str(output_file)
@@ -159,6 +354,59 @@ def save_to_excel(
         raise
 
 
+def save_many_to_excel(
+    tables: List[Tuple[ReviewTable, int]],
+    output_dir: str,
+    writer: str = "openpyxl",
+    max_workers: Optional[int] = None
+) -> List[str]:
+    """
+    Save several rounds of review results, one Excel file per round
+
+    Each workbook is independent and its save is dominated by zip
+    compression, so several tables are saved in separate processes; a
+    single table is saved inline to avoid the process start-up cost.
+    Library entry point for batch runs; the GUI saves one round at a time
+    with save_to_excel().
+
+    Args:
+        tables: (review table, round number) for each file to write
+        output_dir: Output directory
+        writer: One of EXCEL_WRITERS (see save_to_excel)
+        max_workers: Maximum number of processes (default: CPU count)
+
+    Returns:
+        List of generated file paths, in the order of tables
+
+    Raises:
+        ValueError: If a round number appears more than once (both would
+            be written to the same file), any table is empty or writer is unknown
+        Exception: If Excel generation fails
+    """
+    round_counts = Counter(round_number for _, round_number in tables)
+    duplicates = sorted(n for n, count in round_counts.items() if count > 1)
+    if duplicates:
+        raise ValueError(f"Duplicate round numbers: {', '.join(map(str, duplicates))}")
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+
+    if len(tables) <= 1 or max_workers == 1:
+        return [
+            save_to_excel(review_table, round_number, output_dir, writer)
+            for review_table, round_number in tables
+        ]
+
+    workers = min(max_workers, len(tables))
+    logger.info(f"Saving {len(tables)} Excel files with {workers} processes")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(save_to_excel, review_table, round_number, output_dir, writer)
+            for review_table, round_number in tables
+        ]
+        return [future.result() for future in futures]
+
+
 if __name__ == "__main__":
     # Test code
     from models import ReviewRow
@@ -194,3 +442,32 @@ if __name__ == "__main__":
         print(f"Test successful: {output_path}")
     except Exception as e:
         print(f"Test failed: {str(e)}")
+
+    # Both writers must store values the same way (text, blank, no formulas)
+    if _xlsxwriter_available():
+        import io
+        from openpyxl import load_workbook
+
+        tricky_table = ReviewTable(rows=[
+            ReviewRow(
+                requirement_no="=1+1",
+                requirement_content="",
+                evaluation="×",
+                compliance_location="123",
+                compliance_reason="行1\n行2",
+                correction_plan="=",
+                response_status="@未定",
+                response_method="-1"
+            )
+        ])
+        cells = {}
+        for backend in ("openpyxl", "xlsxwriter"):
+            sink = io.BytesIO()
+            save_to_excel(tricky_table, 6, "./output/results", backend, sink)
+            sink.seek(0)
+            ws = load_workbook(sink).active
+            cells[backend] = [(cell.value, cell.data_type) for row in ws.iter_rows() for cell in row]
+        if cells["openpyxl"] == cells["xlsxwriter"]:
+            print("Test successful: openpyxl and xlsxwriter cells match")
+        else:
+            print(f"Test failed: {cells['openpyxl']} != {cells['xlsxwriter']}")